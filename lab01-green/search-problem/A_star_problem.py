@@ -3,14 +3,20 @@ import numpy as np
 from search_problem import Problem
 from search_algorithms import *
 
+#A* problem: nodes carry the path cost g and the heuristic h separately and the frontier is ordered by f = g + h.
+#With a consistent heuristic (manhattan and euclidean are on this grid) closed states are never reopened,
+#otherwise pass consistent=False to reopen them when a cheaper path is found
 class A_star_problem(Problem):
-    def __init__(self,initial, goal, actions, list_of_blocks, heuristic_function):
+    def __init__(self,initial, goal, actions, list_of_blocks, heuristic_function, grid, consistent=True):
         self.heuristic_function=heuristic_function
-        super().__init__(initial,goal, actions, list_of_blocks)
+        self.reopen_closed = not consistent
+        super().__init__(initial,goal, actions, list_of_blocks, grid)
 
     def path_cost(self, path_cost, state)->int:
-        #return 1+path_cost+manhattan_distance(state, self.goal[0])
-        return 1+path_cost+self.heuristic_function(state, self.goal[0])
+        return 1+path_cost
+
+    def h(self, state):
+        return self.heuristic_function(state, self.goal[0])
 
 def manhattan_distance(pos1, pos2):
     return abs(pos1[0]-pos2[0]) + abs(pos1[1]-pos2[1])
@@ -21,21 +27,21 @@ def euclidean_distance(pos1,pos2):
 def getClosestFood(eater_locations, food_locations, heuristic_function):
      return min(food_locations, key=lambda loc: heuristic_function(eater_locations, loc))
 
-def eat_banana(eater_locations,food_locations,actions,list_of_blocks,heuristic_function):
-    firstNode=Node(eater_locations, parent=None, action=None,path_cost=0)
-    problem=A_star_problem(firstNode,[
-        getClosestFood(eater_locations, food_locations, heuristic_function)
-    ],actions,list_of_blocks, heuristic_function)
-    solution, counter =graph_search(problem,Priority_Queue([firstNode]))
+def eat_banana(eater_locations,food_locations,actions,list_of_blocks,heuristic_function,grid,stats=None):
+    goal = getClosestFood(eater_locations, food_locations, heuristic_function)
+    firstNode=Node(eater_locations, parent=None, action=None,path_cost=0, pool=NodePool(grid),
+                   h=heuristic_function(eater_locations, goal))
+    problem=A_star_problem(firstNode,[goal],actions,list_of_blocks, heuristic_function, grid)
+    solution, counter =graph_search(problem,AStarFrontier([firstNode]),stats)
     return solution, counter
 
  
 
-def A_star_runner(eater_locations,food_locations,actions,list_of_blocks,heuristic_function):
+def A_star_runner(eater_locations,food_locations,actions,list_of_blocks,heuristic_function,grid,stats=None):
     monkeyActions = []
     totalCounter = 0
     while len(food_locations) > 0:
-        solution, counter = eat_banana(eater_locations, food_locations, actions, list_of_blocks, heuristic_function)
+        solution, counter = eat_banana(eater_locations, food_locations, actions, list_of_blocks, heuristic_function, grid, stats)
         totalCounter += counter
         monkeyActions += solution.solution()
         food_locations.remove(solution.state)
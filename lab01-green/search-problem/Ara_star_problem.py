@@ -0,0 +1,135 @@
+from heapq import heappush, heappop, heapify
+from itertools import count
+from math import inf
+from time import perf_counter
+from A_star_problem import getClosestFood
+
+
+class ARAStar:
+    """
+    Anytime Repairing A* (ARA*) from start to goal on a compiled grid. The first search is a weighted
+    A* ordered by g + weight * h, which finds a plan quickly; every following iteration lowers the
+    weight and repairs the previous search instead of starting over: the path costs and the parents
+    are kept, and only the states whose cost improved (the open ones and the inconsistent ones, met
+    again after being closed) are searched again. With an admissible heuristic the cost of the plan
+    is at most bound times the optimal one, and a bound of 1 proves the plan optimal.
+    """
+    def __init__(self, grid, start, goal, heuristic_function, weight=2.5, decrement=0.5):
+        self.grid = grid
+        self.start, self.goal = start, goal
+        self.heuristic_function = heuristic_function
+        self.weight = weight
+        self.decrement = decrement
+        self.g = {start: 0}
+        self.parents = {start: (None, None)} # state -> (parent state, action)
+        self.h = {}
+        self.open = {start: self.key(start)} # state -> key of its live heap entry
+        self.heap = [(self.open[start], 0, start)]
+        self.closed = set()
+        self.inconsistent = set()
+        self.counter = count(1)
+        self.iterations = [] # expanded states of every iteration
+        self.bound = inf
+
+    def heuristic(self, state):
+        h = self.h.get(state)
+        if h is None:
+            h = self.h[state] = self.heuristic_function(state, self.goal)
+        return h
+
+    def key(self, state):
+        return self.g[state] + self.weight * self.heuristic(state)
+
+    def improve_path(self, deadline=None):
+        """Expand the open states until the plan to the goal is within the weight; False if the deadline passed first"""
+        expanded = 0
+        heap, open_states, g = self.heap, self.open, self.g
+        while heap:
+            key, _, state = heap[0]
+            if open_states.get(state) != key:
+                heappop(heap) # stale entry of a state closed or queued again with a smaller key
+                continue
+            if g.get(self.goal, inf) <= key:
+                break
+            if deadline is not None and perf_counter() > deadline:
+                self.iterations.append(expanded)
+                return False
+            heappop(heap)
+            del open_states[state]
+            self.closed.add(state)
+            expanded += 1
+            child_g = g[state] + 1
+            for neighbor, action in self.grid.successors(state):
+                if child_g < g.get(neighbor, inf):
+                    g[neighbor] = child_g
+                    self.parents[neighbor] = (state, action)
+                    if neighbor in self.closed:
+                        self.inconsistent.add(neighbor)
+                    else:
+                        open_states[neighbor] = self.key(neighbor)
+                        heappush(heap, (open_states[neighbor], next(self.counter), neighbor))
+        self.iterations.append(expanded)
+        return True
+
+    def update_bound(self):
+        goal_g = self.g.get(self.goal, inf)
+        lower = min((self.g[state] + self.heuristic(state) for state in list(self.open) + list(self.inconsistent)),
+                    default=goal_g)
+        self.bound = min(self.weight, goal_g / lower) if lower > 0 else 1
+
+    def solution(self):
+        actions, state = [], self.goal
+        while state != self.start:
+            state, action = self.parents[state]
+            actions.append(action)
+        return list(reversed(actions))
+
+    def search(self, time_budget=None):
+        """
+        Run ARA* until the plan is proved optimal or time_budget seconds have passed. The first plan is
+        always completed, whatever the budget. Returns the actions to the goal, or None if it is unreachable.
+        """
+        deadline = perf_counter() + time_budget if time_budget is not None else None
+        self.improve_path()
+        if self.goal not in self.g:
+            return None
+        self.update_bound()
+        while self.bound > 1 and (deadline is None or perf_counter() < deadline):
+            self.weight = max(1, self.weight - self.decrement)
+            # repair: the inconsistent states are searched again, with the keys of the new weight
+            for state in self.inconsistent:
+                self.open[state] = None
+            self.inconsistent = set()
+            self.closed = set()
+            for state in self.open:
+                self.open[state] = self.key(state)
+            self.heap = [(key, next(self.counter), state) for state, key in self.open.items()]
+            heapify(self.heap)
+            if not self.improve_path(deadline):
+                break # out of time: the plan found so far is kept, with the bound of the last full iteration
+            self.update_bound()
+        return self.solution()
+
+
+def ara_star_runner(eater_locations,food_locations,actions,list_of_blocks,heuristic_function,grid,time_budget=1.0,weight=2.5):
+    """
+    Eat the food going each time to the closest one like A_star_runner, planning with ARA*. The
+    time_budget in seconds is shared by the searches: each gets the time left over the food left.
+    """
+    deadline = perf_counter() + time_budget
+    monkeyActions = []
+    totalCounter = 0
+    worst_bound = 1
+    while len(food_locations) > 0:
+        goal = getClosestFood(eater_locations, food_locations, heuristic_function)
+        search = ARAStar(grid, eater_locations, goal, heuristic_function, weight)
+        solution = search.search(max(0, deadline - perf_counter()) / len(food_locations))
+        totalCounter += sum(search.iterations)
+        if solution is None:
+            break # the closest food cannot be reached
+        worst_bound = max(worst_bound, search.bound)
+        monkeyActions += solution
+        food_locations.remove(goal)
+        eater_locations = goal
+    print(f"Total nodes visited: {totalCounter}, suboptimality bound: {worst_bound:.3f}")
+    return monkeyActions
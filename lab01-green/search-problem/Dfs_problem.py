@@ -1,40 +1,44 @@
+from collections import Counter
 import numpy as np
 from search_problem import Problem
 from search_algorithms import *
 
 class Dfs_problem(Problem):
-    def __init__(self,initial, goal, actions, list_of_blocks, depth):
+    def __init__(self,initial, goal, actions, list_of_blocks, depth, grid):
         self.depth = depth
-        super().__init__(initial,goal, actions, list_of_blocks)
+        super().__init__(initial,goal, actions, list_of_blocks, grid)
 
-def dfs_runner(eater_locations,food_locations,actions,list_of_blocks):
-    firstNode=Node(eater_locations, parent=None, action=None)
-    problem=Dfs_problem(firstNode,food_locations,actions,list_of_blocks)
-    solution=graph_search(problem,StackFrontier([firstNode]))
+def dfs_runner(eater_locations,food_locations,actions,list_of_blocks,grid):
+    firstNode=Node(eater_locations, parent=None, action=None, pool=NodePool(grid))
+    problem=Dfs_problem(firstNode,food_locations,actions,list_of_blocks,None,grid) #no depth limit
+    solution,counter=graph_search(problem,StackFrontier([firstNode]))
     return solution.solution()
 
-def eat_banana(eater_locations,food_locations,actions,list_of_blocks):
+def eat_banana(eater_locations,food_locations,actions,list_of_blocks,counters,grid,stats=None):
     depth=0
     solution=None
     counter = 0
     while(depth!=100):        
-        firstNode=Node(eater_locations, parent=None, action=None)
-        problem=Dfs_problem(firstNode,food_locations,actions,list_of_blocks,depth)
-        solution,counter=graph_search(problem,StackFrontier([firstNode]))
+        firstNode=Node(eater_locations, parent=None, action=None, pool=NodePool(grid))
+        problem=Dfs_problem(firstNode,food_locations,actions,list_of_blocks,depth,grid)
+        solution,counter=graph_search(problem,StackFrontier([firstNode],counters),stats)
         if(solution==None or solution==[]):
             depth+=1
         else:
             return solution,counter
     return solution, counter
 
-def iterative_deepening_runner(eater_locations,food_locations,actions,list_of_blocks):
+def iterative_deepening_runner(eater_locations,food_locations,actions,list_of_blocks,grid,stats=None):
     monkeyActions = []
     totalCounter = 0
+    frontierCounters = Counter()
     while len(food_locations) > 0:
-        solution, counter = eat_banana(eater_locations, food_locations, actions, list_of_blocks)
+        solution, counter = eat_banana(eater_locations, food_locations, actions, list_of_blocks, frontierCounters, grid, stats)
         totalCounter += counter
         monkeyActions += solution.solution()
         food_locations.remove(solution.state)
         eater_locations = solution.state
     print(f"Total nodes visited: {totalCounter}")
+    print(f"Frontier lookups: {frontierCounters['lookups']}, duplicates pruned: {frontierCounters['pruned']}, "
+          f"comparisons saved: {frontierCounters['comparisons_saved']}")
     return monkeyActions
\ No newline at end of file
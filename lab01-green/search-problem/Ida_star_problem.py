@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from math import inf
+
+
+class TranspositionTable:
+    """
+    Bounded table of the states met by IDA*, evicting the least recently used ones.
+    For every state it keeps the heuristic value learned in the previous iterations
+    (backed up from its failed subtrees, so still a lower bound on the cost to the goal)
+    and the smallest path cost it was reached with in the current iteration.
+    """
+    def __init__(self, heuristic, max_entries=1 << 16):
+        self.heuristic = heuristic
+        self.max_entries = max_entries
+        self.entries = OrderedDict() # state -> [learned h, iteration, path cost]
+
+    def entry(self, state):
+        entry = self.entries.get(state)
+        if entry is None:
+            entry = self.entries[state] = [self.heuristic(state), -1, inf]
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(state)
+        return entry
+
+    def h(self, state):
+        entry = self.entries.get(state)
+        return entry[0] if entry is not None else self.heuristic(state)
+
+
+def bounded_dfs(grid, start, goals, table, bound, iteration):
+    """
+    One IDA* iteration: depth-first search of the paths with f = g + h <= bound, with an explicit
+    stack. Returns the list of actions to a goal (or None), the number of expanded nodes and the
+    smallest f that exceeded the bound, which is the bound of the next iteration.
+    """
+    # frame: [state, path cost, successors, next successor, action, backed-up f of the children]
+    stack = [[start, 0, grid.successors(start), 0, None, inf]]
+    table.entry(start)[1:] = [iteration, 0]
+    expanded, next_bound = 1, inf
+    while stack:
+        frame = stack[-1]
+        state, g, successors, i = frame[0], frame[1], frame[2], frame[3]
+        if i == len(successors):
+            # subtree failed: learn its backed-up value and pass it to the parent
+            stack.pop()
+            entry = table.entry(state)
+            entry[0] = max(entry[0], frame[5] - g)
+            if stack:
+                stack[-1][5] = min(stack[-1][5], g + entry[0])
+            continue
+        frame[3] = i + 1
+        neighbor, action = successors[i]
+        child_g = g + 1
+        f = child_g + table.h(neighbor)
+        if f > bound:
+            next_bound = min(next_bound, f)
+            frame[5] = min(frame[5], f)
+            continue
+        if neighbor in goals:
+            return [path_frame[4] for path_frame in stack[1:]] + [action], expanded, next_bound
+        entry = table.entry(neighbor)
+        if entry[1] == iteration and entry[2] <= child_g:
+            # transposition: already searched in this iteration with a smaller budget used
+            frame[5] = min(frame[5], child_g + entry[0])
+            continue
+        entry[1], entry[2] = iteration, child_g
+        stack.append([neighbor, child_g, grid.successors(neighbor), 0, action, inf])
+        expanded += 1
+    return None, expanded, next_bound
+
+
+def ida_star(grid, start, goals, heuristic_function, table_size=1 << 16):
+    """
+    IDA* from start to the nearest of the goals, with the f-bound raised at every iteration to
+    the smallest f that exceeded it (until it exceeds the number of free cells). The
+    transposition table is kept across the iterations, so values learned by a failed iteration
+    prune the next ones. Returns the actions to a goal (or None) and the expansions of every
+    iteration.
+    """
+    goals = set(goals)
+    if start in goals:
+        return [], [0]
+    heuristic = lambda state: min(heuristic_function(state, goal) for goal in goals)
+    table = TranspositionTable(heuristic, table_size)
+    bound, iterations = heuristic(start), []
+    # a shortest path never visits a cell twice, beyond this bound the goals are unreachable
+    max_bound = int(grid.free.sum())
+    while bound < max_bound:
+        actions, expanded, bound = bounded_dfs(grid, start, goals, table, bound, len(iterations))
+        iterations.append(expanded)
+        if actions is not None:
+            return actions, iterations
+    return None, iterations
+
+
+def ida_star_runner(eater_locations,food_locations,actions,list_of_blocks,heuristic_function,grid,table_size=1 << 16):
+    monkeyActions = []
+    totalCounter = 0
+    while len(food_locations) > 0:
+        solution, iterations = ida_star(grid, eater_locations, food_locations, heuristic_function, table_size)
+        totalCounter += sum(iterations)
+        print(f"Expanded nodes per iteration: {iterations}")
+        if solution is None:
+            break # the remaining food cannot be reached
+        monkeyActions += solution
+        for action in solution:
+            eater_locations = (eater_locations[0] + action.value[0], eater_locations[1] + action.value[1])
+        food_locations.remove(eater_locations)
+    print(f"Total nodes visited: {totalCounter}")
+    return monkeyActions
@@ -0,0 +1,93 @@
+from A_star_problem import A_star_problem, manhattan_distance, getClosestFood
+from search_problem import Node, NodePool
+from search_algorithms import graph_search, AStarFrontier
+
+#Jump Point Search adapted to 4-connected unit-cost grids.
+#Successors are the jump points reached moving straight from a node instead of its neighbours:
+#a horizontal jump stops at the goal or at a cell with a forced vertical neighbour (free while the cell
+#behind it is blocked), a vertical jump also stops at a cell from which a horizontal jump finds a jump point.
+#Every jump is a straight segment, so its cost is the manhattan distance and A* stays optimal.
+class Jps_problem(A_star_problem):
+    def __init__(self,initial, goal, actions, list_of_blocks, heuristic_function, grid):
+        super().__init__(initial, goal, actions, list_of_blocks, heuristic_function, grid)
+        self.walkable = self.grid.free.tolist() # walkable[x][y], faster to index than the NumPy array
+        self.directions = {action.value: action for action in self.grid.actions}
+        self.scanned = 0 # cells visited by the jumps
+
+    def is_walkable(self, x, y):
+        return 0 <= x < self.grid.width and 0 <= y < self.grid.height and self.walkable[x][y]
+
+    def jump_horizontal(self, x, y, dx):
+        goal, walkable = self.goal[0], self.is_walkable
+        while True:
+            x += dx
+            self.scanned += 1
+            if not walkable(x, y):
+                return None
+            if (x, y) == goal:
+                return (x, y)
+            if (walkable(x, y - 1) and not walkable(x - dx, y - 1)) or (walkable(x, y + 1) and not walkable(x - dx, y + 1)):
+                return (x, y)
+
+    def jump_vertical(self, x, y, dy):
+        goal, walkable = self.goal[0], self.is_walkable
+        while True:
+            y += dy
+            self.scanned += 1
+            if not walkable(x, y):
+                return None
+            if (x, y) == goal:
+                return (x, y)
+            if (walkable(x - 1, y) and not walkable(x - 1, y - dy)) or (walkable(x + 1, y) and not walkable(x + 1, y - dy)):
+                return (x, y)
+            if self.jump_horizontal(x, y, 1) is not None or self.jump_horizontal(x, y, -1) is not None:
+                return (x, y)
+
+    #Returns the (jump point, direction) pairs of the node: every direction but the one it came from
+    def actions(self, node):
+        x, y = node.state
+        came_from = node.action.value if node.action is not None else (0, 0)
+        #the cost of the jumps of this expansion is measured from here by path_cost
+        self.origin = node.state
+        moves = []
+        for (dx, dy), action in self.directions.items():
+            if (dx, dy) == (-came_from[0], -came_from[1]):
+                continue
+            point = self.jump_horizontal(x, y, dx) if dx != 0 else self.jump_vertical(x, y, dy)
+            if point is not None:
+                moves.append((point, action))
+        return moves
+
+    def path_cost(self, path_cost, state)->int:
+        return path_cost + manhattan_distance(self.origin, state)
+
+#The solution of a JPS node has one action per jump: repeat each of them for the length of the jump
+def jps_solution(node):
+    actions = []
+    path = node.path()
+    for previous, current in zip(path, path[1:]):
+        actions += [current.action] * manhattan_distance(previous.state, current.state)
+    return actions
+
+def eat_banana(eater_locations,food_locations,actions,list_of_blocks,heuristic_function,grid,stats=None):
+    goal = getClosestFood(eater_locations, food_locations, heuristic_function)
+    firstNode=Node(eater_locations, pool=NodePool(grid), h=heuristic_function(eater_locations, goal))
+    problem=Jps_problem(firstNode,[goal],actions,list_of_blocks, heuristic_function, grid)
+    solution, counter =graph_search(problem,AStarFrontier([firstNode]),stats)
+    return solution, counter, problem.scanned
+
+def jps_runner(eater_locations,food_locations,actions,list_of_blocks,heuristic_function,grid,stats=None):
+    monkeyActions = []
+    totalCounter = 0
+    totalScanned = 0
+    while len(food_locations) > 0:
+        solution, counter, scanned = eat_banana(eater_locations, food_locations, actions, list_of_blocks, heuristic_function, grid, stats)
+        totalCounter += counter
+        totalScanned += scanned
+        if solution is None:
+            break # the closest food cannot be reached
+        monkeyActions += jps_solution(solution)
+        food_locations.remove(solution.state)
+        eater_locations = solution.state
+    print(f"Total nodes visited: {totalCounter}, cells scanned by the jumps: {totalScanned}")
+    return monkeyActions
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+"""
+Batch runner playing many episodes in parallel over a pool of worker processes.
+
+Every episode is a player entry point (module:Class, as for gridrunner) playing on a world
+file or on a random world built from a seed. The episodes are spread over a
+ProcessPoolExecutor with one worker per core: each worker imports the players and reads the
+world files once and reuses them for all its episodes, and the results are yielded as soon as
+they complete.
+
+    python batch_runner.py --entry solver:AStarManhattanPlayer solver:UCSPlayer --worlds worlds/*.json
+    python batch_runner.py --world WumpusWorld --path ../../lab05-green/online-wumpus \\
+        --entry solver:UserPlayerSafe solver:UserPlayerRisky --seeds 0-99 --size 4
+
+Modules with the same name in different paths (e.g. two solver.py) cannot be mixed in a run.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import wumpus
+
+from world_generator import parse_seeds
+
+# State of a worker process, reused by all the episodes it plays
+_players = {}
+_worlds = {}
+
+
+def _init_worker(paths):
+    for path in reversed(paths):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def load_player(entry):
+    """Return the player class of a module:Class entry point, importing it once per process"""
+    player_class = _players.get(entry)
+    if player_class is None:
+        module_name, class_name = entry.split(':')
+        player_class = _players[entry] = getattr(importlib.import_module(module_name), class_name)
+    return player_class
+
+
+def make_world(world_class, world, size):
+    """A new world of the given class from a world file (read once per process) or from a seed"""
+    cls = getattr(wumpus, world_class)
+    if isinstance(world, int):
+        random.seed(world)
+        if world_class == 'WumpusWorld':
+            return cls.classic(size=size or random.randint(4, 8))
+        return cls.random(size=wumpus.coord(size, size) if size else None)
+    desc = _worlds.get(world)
+    if desc is None:
+        with open(world) as fp:
+            desc = _worlds[world] = json.load(fp)
+    return cls.from_JSON(desc)
+
+
+def play(entry, world_class, world, size, horizon):
+    """Play one episode in a worker, returning its outcome as a dict"""
+    result = {'entry': entry, 'world': world, 'reward': None, 'alive': None, 'success': None,
+              'steps': None, 'time': None, 'error': None}
+    start = time.perf_counter()
+    try:
+        player = load_player(entry)(entry.split(':')[-1])
+        with contextlib.redirect_stdout(io.StringIO()):
+            outcome = wumpus.run_episode(make_world(world_class, world, size), player, horizon=horizon, show=False)
+        result.update(reward=outcome['reward'], alive=outcome['alive'], success=outcome['success'],
+                      steps=len(outcome['actions']))
+        if outcome.get('exceptions'):
+            result['error'] = '; '.join(str(exception) for exception in outcome['exceptions'])
+    except Exception as e:
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+    result['time'] = time.perf_counter() - start
+    return result
+
+
+def batch_run(entries, worlds, world_class='EaterWorld', horizon=200, size=0, workers=None, paths=()):
+    """
+    Play every entry point on every world (file names or integer seeds) and yield the result
+    of each episode as soon as it completes, in completion order.
+    """
+    paths = [os.path.abspath(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(paths,)) as pool:
+        futures = [pool.submit(play, entry, world_class, world, size, horizon)
+                   for world in worlds for entry in entries]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summary(results):
+    """Episodes, mean reward, successes and mean episode time of every entry point"""
+    table = {}
+    for result in results:
+        row = table.setdefault(result['entry'], {'episodes': 0, 'reward': 0, 'successes': 0, 'errors': 0, 'time': 0.0})
+        row['episodes'] += 1
+        row['time'] += result['time']
+        if result['error'] is not None:
+            row['errors'] += 1
+            continue
+        row['reward'] += result['reward']
+        row['successes'] += bool(result['success'])
+    for entry, row in table.items():
+        played = row['episodes'] - row['errors']
+        print('{:<32} episodes {:>5}  mean reward {:>9.2f}  successes {:>5}  errors {:>4}  mean time {:.4f}s'.format(
+            entry, row['episodes'], row['reward'] / played if played else 0, row['successes'], row['errors'],
+            row['time'] / row['episodes']))
+
+
+def main(*args):
+    parser = argparse.ArgumentParser(description='Play many episodes in parallel')
+    parser.add_argument('--entry', nargs='+', required=True, help='player entry points as module:Class')
+    parser.add_argument('--worlds', nargs='*', default=[], help='world JSON files')
+    parser.add_argument('--seeds', default='', help='seeds of random worlds, e.g. 0-99,200')
+    parser.add_argument('--world', default='EaterWorld', help='world class (EaterWorld or WumpusWorld)')
+    parser.add_argument('--size', type=int, default=0, help='size of the random worlds (default: random)')
+    parser.add_argument('--horizon', type=int, default=200, help='maximum number of steps of an episode')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--path', nargs='*', default=['.'], help='directories the entry modules are imported from')
+    parser.add_argument('--jsonl', help='append the results to this file, one JSON object per line')
+    options = parser.parse_args(args)
+
+    worlds = options.worlds + (parse_seeds(options.seeds) if options.seeds else [])
+    if not worlds:
+        parser.error('no world files or seeds given')
+
+    results = []
+    start = time.perf_counter()
+    output = open(options.jsonl, 'a') if options.jsonl else None
+    try:
+        for result in batch_run(options.entry, worlds, options.world, options.horizon, options.size,
+                                options.workers, options.path):
+            results.append(result)
+            print('{entry} {world}: reward {reward} success {success} steps {steps} ({time:.3f}s){error}'.format(
+                **dict(result, error=' error: ' + result['error'] if result['error'] else '')))
+            if output is not None:
+                output.write(json.dumps(result) + '\n')
+                output.flush()
+    finally:
+        if output is not None:
+            output.close()
+    elapsed = time.perf_counter() - start
+    summary(results)
+    print('{} episodes in {:.2f}s ({:.1f} episodes/s)'.format(len(results), elapsed, len(results) / elapsed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
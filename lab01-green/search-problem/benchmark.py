@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks of the search algorithms on the worlds in the worlds folder.
+
+Run with `python benchmark.py [world files]` to compare the A* formulations on the world files,
+or with `python benchmark.py --jps [size] [seeds]` to compare JPS and A* on random open maps,
+or with `python benchmark.py --hpa [size] [seeds] [queries]` to compare HPA* and A* on generated rooms maps.
+"""
+
+import glob
+import random
+import sys
+import time
+
+import numpy as np
+from wumpus import Eater, EaterWorld, Food, coord
+
+from A_star_problem import A_star_problem, getClosestFood, manhattan_distance, euclidean_distance
+from Jps_problem import Jps_problem, jps_solution
+from hpa_star import HierarchicalGrid
+from compiled_grid import CompiledGrid
+from search_algorithms import *
+from world_generator import generate_world, MOVES
+
+
+def load_world(path):
+    """Return the eater location, the food locations, the actions, the blocks and the compiled grid of a world file"""
+    with open(path) as fp:
+        return world_problem(EaterWorld.from_JSON(fp))
+
+
+def world_problem(world):
+    """Return the eater location, the food locations, the actions, the blocks and the compiled grid of a world"""
+    food_locations = []
+    for o in world.objects:
+        if isinstance(o, Eater):
+            eater_location = (o.location.x, o.location.y)
+            actions = list(o.Actions)
+        elif isinstance(o, Food):
+            food_locations.append((o.location.x, o.location.y))
+    block_locations = sorted((bl.x, bl.y) for bl in world.blocks)
+    return eater_location, food_locations, actions, block_locations, CompiledGrid.from_world(world, actions)
+
+
+#The A* formulation used before nodes carried g and h separately: the heuristic is added
+#into the path cost at every step and the frontier is ordered by that sum
+class Legacy_A_star_problem(A_star_problem):
+    def path_cost(self, path_cost, state)->int:
+        return 1+path_cost+self.heuristic_function(state, self.goal[0])
+
+    def h(self, state):
+        return 0
+
+
+def run_astar(eater_location, food_locations, actions, block_locations, grid, heuristic_function, legacy):
+    """Eat all the food like A_star_runner, returning the expanded nodes and the plan length"""
+    food_locations = list(food_locations)
+    expanded, plan_length = 0, 0
+    while food_locations:
+        goal = getClosestFood(eater_location, food_locations, heuristic_function)
+        if legacy:
+            first_node = Node(eater_location, pool=NodePool(grid))
+            problem = Legacy_A_star_problem(first_node, [goal], actions, block_locations, heuristic_function, grid)
+            frontier = Priority_Queue([first_node])
+        else:
+            first_node = Node(eater_location, pool=NodePool(grid), h=heuristic_function(eater_location, goal))
+            problem = A_star_problem(first_node, [goal], actions, block_locations, heuristic_function, grid)
+            frontier = AStarFrontier([first_node])
+        solution, counter = graph_search(problem, frontier)
+        expanded += counter
+        plan_length += len(solution.solution())
+        food_locations.remove(solution.state)
+        eater_location = solution.state
+    return expanded, plan_length
+
+
+def compare_astar(world_files):
+    """Compare the expanded nodes of the legacy A* and of A* ordered on f = g + h"""
+    print('{:<22} {:<10} {:>15} {:>15}'.format('world', 'heuristic', 'legacy', 'f = g + h'))
+    for path in world_files:
+        world = load_world(path)
+        for heuristic_function in (manhattan_distance, euclidean_distance):
+            legacy = run_astar(*world, heuristic_function, legacy=True)
+            current = run_astar(*world, heuristic_function, legacy=False)
+            print('{:<22} {:<10} {:>15} {:>15}'.format(
+                path.split('/')[-1], heuristic_function.__name__.split('_')[0],
+                '{} ({})'.format(*legacy), '{} ({})'.format(*current)))
+    print('expanded nodes (plan length)')
+
+
+def run_jps(eater_location, food_locations, actions, block_locations, grid, jps):
+    """Eat all the food going each time to the closest one like A_star_runner, with JPS or plain A*,
+    returning the expanded nodes, the cells scanned by the jumps and the plan length"""
+    food_locations = list(food_locations)
+    expanded, scanned, plan_length = 0, 0, 0
+    while food_locations:
+        goal = getClosestFood(eater_location, food_locations, manhattan_distance)
+        first_node = Node(eater_location, pool=NodePool(grid), h=manhattan_distance(eater_location, goal))
+        problem_class = Jps_problem if jps else A_star_problem
+        problem = problem_class(first_node, [goal], actions, block_locations, manhattan_distance, grid)
+        solution, counter = graph_search(problem, AStarFrontier([first_node]))
+        expanded += counter
+        scanned += getattr(problem, 'scanned', 0)
+        if solution is None:
+            break
+        plan_length += len(jps_solution(solution) if jps else solution.solution())
+        food_locations.remove(solution.state)
+        eater_location = solution.state
+    return expanded, scanned, plan_length
+
+
+def compare_jps(size=200, seeds=5, food=10):
+    """Compare the expansions and the wall time of JPS and A* (manhattan) on random open maps
+    of size x size cells, with up to 10% of blocks placed by EaterWorld.random"""
+    header = ('seed', 'A* expanded (plan)', 'time', 'JPS expanded (plan)', 'time', 'JPS scanned')
+    print('{:<10} {:>22} {:>10} {:>22} {:>10} {:>12}'.format(*header))
+    for seed in range(seeds):
+        random.seed(seed)
+        world = world_problem(EaterWorld.random(size=coord(size, size), blocks=None, food_amount=food))
+        row = []
+        for jps in (False, True):
+            start = time.perf_counter()
+            expanded, scanned, plan_length = run_jps(*world, jps)
+            row += ['{} ({})'.format(expanded, plan_length), '{:.3f}s'.format(time.perf_counter() - start)]
+        print('{:<10} {:>22} {:>10} {:>22} {:>10} {:>12}'.format(seed, *row, scanned))
+
+
+def compare_hpa(size=500, seeds=3, queries=20, cluster_size=10):
+    """Compare the expansions, the wall time and the path lengths of HPA* and A* (manhattan) between
+    random free cells of rooms maps of size x size cells made by world_generator"""
+    header = ('seed', 'A* expanded', 'time', 'HPA* expanded', 'cached', 'time', 'longest path ratio')
+    print('{:<6} {:>12} {:>9} {:>14} {:>10} {:>9} {:>19}'.format(*header))
+    for seed in range(seeds):
+        world = generate_world('rooms', size, seed, food=1)
+        grid = CompiledGrid(world.size, (), MOVES, free=world.free)
+        rng = random.Random(seed)
+        free = [tuple(int(v) for v in cell) for cell in np.argwhere(world.free)]
+        pairs = [(rng.choice(free), rng.choice(free)) for _ in range(queries)]
+        start = time.perf_counter()
+        lengths, expanded = [], 0
+        for eater_location, goal in pairs:
+            first_node = Node(eater_location, pool=NodePool(grid), h=manhattan_distance(eater_location, goal))
+            problem = A_star_problem(first_node, [goal], MOVES, [], manhattan_distance, grid)
+            solution, counter = graph_search(problem, AStarFrontier([first_node]))
+            expanded += counter
+            lengths.append(len(solution.solution()))
+        astar_time = time.perf_counter() - start
+        start = time.perf_counter()
+        hierarchy = HierarchicalGrid(grid, cluster_size)
+        ratio = max(len(hierarchy.search(*pair)) / max(length, 1) for pair, length in zip(pairs, lengths))
+        print('{:<6} {:>12} {:>8.3f}s {:>14} {:>10} {:>8.3f}s {:>19.3f}'.format(
+            seed, expanded, astar_time, hierarchy.expanded, hierarchy.cached, time.perf_counter() - start, ratio))
+
+
+def main(*args):
+    if args and args[0] == '--jps':
+        compare_jps(*(int(a) for a in args[1:]))
+        return 0
+    if args and args[0] == '--hpa':
+        compare_hpa(*(int(a) for a in args[1:]))
+        return 0
+    world_files = list(args) or sorted(glob.glob('worlds/eater-world_*.json'))
+    compare_astar(world_files)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class CompiledGrid:
+    """
+    A static grid world compiled once for the search problems.
+    Cells are numbered with integer ids (id = x*height + y), the blocks are stored in a
+    NumPy occupancy bitmap indexed as free[x, y], and the successors of every cell are
+    precomputed in a CSR table: the moves of cell c are successor_ids[indptr[c]:indptr[c+1]]
+    with the corresponding indexes of `actions` in action_codes.
+    The occupancy bitmap can also be given directly as free, in place of the blocks.
+    """
+    def __init__(self, size, blocks, actions, free=None):
+        self.width, self.height = int(size[0]), int(size[1])
+        self.size = (self.width, self.height)
+        self.actions = list(actions)
+        if free is not None:
+            self.free = np.array(free, dtype=bool).reshape(self.size)
+        else:
+            self.free = np.ones(self.size, dtype=bool)
+            for x, y in blocks:
+                if 0 <= x < self.width and 0 <= y < self.height:
+                    self.free[x, y] = False
+        self.n_cells = self.width * self.height
+
+        ids = np.arange(self.n_cells, dtype=np.int64).reshape(self.size)
+        targets = np.full(self.size + (len(self.actions),), -1, dtype=np.int64)
+        for code, action in enumerate(self.actions):
+            # the cells whose move stays inside the grid, and the cells they move to
+            source = tuple(slice(max(0, -d), n - max(0, d)) for d, n in zip(action.value, self.size))
+            target = tuple(slice(max(0, d), n - max(0, -d)) for d, n in zip(action.value, self.size))
+            np.copyto(targets[source + (code,)], ids[target], where=self.free[target])
+        targets = targets.reshape(self.n_cells, len(self.actions))
+        valid = targets >= 0
+        self.indptr = np.zeros(self.n_cells + 1, dtype=np.int64)
+        np.cumsum(np.count_nonzero(valid, axis=1), out=self.indptr[1:])
+        self.successor_ids = targets[valid]
+        codes = np.broadcast_to(np.arange(len(self.actions), dtype=np.int8), valid.shape)
+        self.action_codes = codes[valid]
+        # Python view of the CSR rows, materialised on first use of each cell
+        self.moves = [None] * self.n_cells
+
+    @classmethod
+    def from_world(cls, world, actions):
+        return cls((world.size.x, world.size.y), ((b.x, b.y) for b in world.blocks), actions)
+
+    def cell_id(self, state):
+        return state[0] * self.height + state[1]
+
+    def cell(self, cell_id):
+        return divmod(int(cell_id), self.height)
+
+    def is_free(self, state):
+        return (0 <= state[0] < self.width and 0 <= state[1] < self.height
+                and bool(self.free[state[0], state[1]]))
+
+    def successors(self, state):
+        """Return the tuple of (neighbor, action) pairs reachable from state"""
+        cell_id = self.cell_id(state)
+        moves = self.moves[cell_id]
+        if moves is None:
+            start, end = self.indptr[cell_id], self.indptr[cell_id + 1]
+            moves = tuple((self.cell(neighbor), self.actions[code])
+                          for neighbor, code in zip(self.successor_ids[start:end], self.action_codes[start:end]))
+            self.moves[cell_id] = moves
+        return moves
+
+    def distance_field(self, source):
+        """
+        Return the path costs from source to every cell as an int32 array indexed by cell id
+        (-1 where unreachable). The BFS wavefront is propagated with NumPy: at every step the
+        successors of the whole frontier are gathered from the CSR table at once.
+        """
+        distance = np.full(self.n_cells, -1, dtype=np.int32)
+        frontier = np.array([self.cell_id(source)], dtype=np.int64)
+        distance[frontier] = 0
+        slot = np.empty(self.n_cells, dtype=np.int64)
+        cost = 0
+        while frontier.size:
+            cost += 1
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            neighbors = self.successor_ids[np.repeat(starts, counts) + offsets]
+            reached = neighbors[distance[neighbors] < 0]
+            # drop the cells reached twice in the step without sorting: keep the last write
+            slot[reached] = np.arange(reached.size)
+            frontier = reached[slot[reached] == np.arange(reached.size)]
+            distance[frontier] = cost
+        return distance
@@ -0,0 +1,39 @@
+from collections import OrderedDict
+from math import inf
+
+
+class DistanceHeuristic:
+    """
+    Exact path costs to the goals of a compiled grid, usable as the heuristic_function(state, goal)
+    of the A* runners. The distance field of a goal is computed on its first query with a NumPy
+    BFS wavefront (CompiledGrid.distance_field) and kept in a cache of at most max_bytes, evicting
+    the least recently used fields. The moves are reversible, so the path cost from a state to the
+    goal is the one from the goal to the state. Unreachable states get an infinite estimate.
+    """
+    def __init__(self, grid, max_bytes=64 * 2**20):
+        self.grid = grid
+        self.max_bytes = max_bytes
+        self.fields = OrderedDict() # goal -> distance field
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def field(self, goal):
+        field = self.fields.get(goal)
+        if field is not None:
+            self.hits += 1
+            self.fields.move_to_end(goal)
+            return field
+        self.misses += 1
+        field = self.grid.distance_field(goal)
+        self.fields[goal] = field
+        self.bytes += field.nbytes
+        # always keep the field just computed, even if it alone exceeds the budget
+        while self.bytes > self.max_bytes and len(self.fields) > 1:
+            _, evicted = self.fields.popitem(last=False)
+            self.bytes -= evicted.nbytes
+        return field
+
+    def __call__(self, state, goal):
+        distance = self.field(goal)[self.grid.cell_id(state)]
+        return int(distance) if distance >= 0 else inf
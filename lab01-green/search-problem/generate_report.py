@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+
+"""
+In-process benchmark of the search players on the worlds in the worlds folder.
+
+Every world file is loaded once and every GeneralSearchPlayer subclass of solver.py plans on it
+after some warmup runs, measuring the wall time of the planning (median and best of the
+repetitions), the expanded nodes, the peak memory allocated by the search and the plan length.
+The results can be written as JSON and CSV and compared against a stored baseline:
+
+    python generate_report.py --json report.json --csv report.csv
+    python generate_report.py --save-baseline baseline.json
+    python generate_report.py --baseline baseline.json    # exit status 1 on regressions
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+from wumpus import EaterWorld
+
+import solver
+
+FIELDS = ('world', 'player', 'plan_length', 'expanded', 'median_time', 'best_time', 'peak_memory', 'error')
+TOTAL_NODES = re.compile(r'Total nodes visited: (\d+)')
+
+
+def search_players():
+    """The player classes defined in solver.py, in order of definition"""
+    return {name: value for name, value in vars(solver).items()
+            if isinstance(value, type) and issubclass(value, solver.GeneralSearchPlayer)
+            and value is not solver.GeneralSearchPlayer}
+
+
+def plan(player_class, world):
+    """Let a new player plan on the world, returning the player, the plan and the printed output"""
+    player = player_class(player_class.__name__)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        actions = list(player.start_episode(world))
+    return player, actions, output.getvalue()
+
+
+def expanded_nodes(player, output):
+    """Nodes expanded by the player: from its SearchStats if it used graph_search, otherwise
+    from the total it printed (-1 if it does not report one)"""
+    stats = getattr(player, 'stats', None)
+    if stats is not None and stats.searches:
+        return stats.expanded
+    totals = TOTAL_NODES.findall(output)
+    return int(totals[-1]) if totals else -1
+
+
+def measure(world_name, world, player_class, repeat, warmup):
+    record = dict.fromkeys(FIELDS)
+    record.update(world=world_name, player=player_class.__name__)
+    try:
+        for _ in range(warmup):
+            plan(player_class, world)
+        times = []
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            player, actions, output = plan(player_class, world)
+            times.append(time.perf_counter() - start)
+        # memory is measured on its own run, tracemalloc slows down the allocations
+        tracemalloc.start()
+        try:
+            plan(player_class, world)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        record['error'] = '{}: {}'.format(type(e).__name__, e)
+        return record
+    record.update(plan_length=len(actions), expanded=expanded_nodes(player, output),
+                  median_time=statistics.median(times), best_time=min(times), peak_memory=peak_memory)
+    return record
+
+
+def run(world_files, player_classes, repeat=5, warmup=1):
+    records = []
+    for path in world_files:
+        with open(path) as fp:
+            world = EaterWorld.from_JSON(fp)
+        world_name = path.replace('\\', '/').split('/')[-1]
+        for player_class in player_classes:
+            record = measure(world_name, world, player_class, repeat, warmup)
+            print_record(record)
+            records.append(record)
+    return records
+
+
+def print_record(record):
+    if record['error'] is not None:
+        print('{:<20} {:<26} error: {}'.format(record['world'], record['player'], record['error']))
+        return
+    print('{:<20} {:<26} plan {:>4}  expanded {:>7}  median {:>9.4f}s  best {:>9.4f}s  peak {:>8.1f} KiB'.format(
+        record['world'], record['player'], record['plan_length'], record['expanded'],
+        record['median_time'], record['best_time'], record['peak_memory'] / 1024))
+
+
+def regressions(records, baseline, tolerance):
+    """
+    Compare the records with the baseline ones of the same world and player. Longer plans, more
+    expanded nodes and new errors are always regressions, while the median time and the peak
+    memory are regressions when they grow by more than the tolerance (a fraction).
+    """
+    previous = {(r['world'], r['player']): r for r in baseline}
+    found = []
+    for record in records:
+        old = previous.get((record['world'], record['player']))
+        if old is None:
+            continue
+        key = '{} {}'.format(record['world'], record['player'])
+        if record['error'] is not None:
+            if old['error'] is None:
+                found.append('{}: {}'.format(key, record['error']))
+            continue
+        if old['error'] is not None:
+            continue
+        for field in ('plan_length', 'expanded'):
+            if record[field] > old[field]:
+                found.append('{}: {} {} -> {}'.format(key, field, old[field], record[field]))
+        for field in ('median_time', 'peak_memory'):
+            if record[field] > old[field] * (1 + tolerance):
+                found.append('{}: {} {:.4g} -> {:.4g} (+{:.0%})'.format(
+                    key, field, old[field], record[field], record[field] / old[field] - 1))
+    return found
+
+
+def write_csv(records, path):
+    with open(path, 'w', newline='') as fp:
+        writer = csv.DictWriter(fp, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def write_json(records, path):
+    with open(path, 'w') as fp:
+        json.dump(records, fp, indent=2)
+
+
+def main(*args):
+    parser = argparse.ArgumentParser(description='Benchmark the search players on the world files')
+    parser.add_argument('worlds', nargs='*', help='world files (default: worlds/eater-world_*.json)')
+    parser.add_argument('--players', nargs='+', help='names of the players (default: every player in solver.py)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs of every player on every world')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs before the timed ones')
+    parser.add_argument('--json', help='write the results to this JSON file')
+    parser.add_argument('--csv', help='write the results to this CSV file')
+    parser.add_argument('--baseline', help='JSON results to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative growth of time and memory over the baseline')
+    parser.add_argument('--save-baseline', help='write the results as a new baseline to this JSON file')
+    options = parser.parse_args(args)
+
+    players = search_players()
+    player_classes = [players[name] for name in options.players] if options.players else list(players.values())
+    world_files = options.worlds or sorted(glob.glob('worlds/eater-world_*.json'))
+    records = run(world_files, player_classes, options.repeat, options.warmup)
+
+    if options.json:
+        write_json(records, options.json)
+    if options.csv:
+        write_csv(records, options.csv)
+    if options.save_baseline:
+        write_json(records, options.save_baseline)
+    if options.baseline:
+        with open(options.baseline) as fp:
+            found = regressions(records, json.load(fp), options.tolerance)
+        for regression in found:
+            print('REGRESSION ' + regression)
+        if found:
+            return 1
+        print('No regressions against {}'.format(options.baseline))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
@@ -1,18 +1,10 @@
 #!/bin/bash
 
-worlds=("eater-world_1.json" "eater-world_2.json" "eater-world_3.json" "eater-world_4.json" "eater-world_5.json")
-players=("AStarManhattanPlayer" AStarEuclideanPlayer "UCSPlayer" "IterativeDeepeningPlayer")
+# The benchmark runs in process in generate_report.py, this wrapper keeps the old entry point:
+# the text report goes to output.txt, JSON and CSV results to report.json and report.csv.
+# Extra arguments are passed along, e.g. ./generate_report.sh --baseline baseline.json
 
-> output.txt
-
-for world in "${worlds[@]}"; do
-  for player in "${players[@]}"; do
-    echo "Running gridrunner for World: $world, Player: $player"
-    
-    output=$(/usr/bin/time -v gridrunner --world EaterWorld --entry solver:"$player" --horizon 200 "worlds/$world" 2>&1)
-    
-    echo "$output" >> output.txt
-    
-    echo "Finished running gridrunner for World: $world, Player: $player"
-  done
-done
+python generate_report.py --json report.json --csv report.csv "$@" > output.txt
+status=$?
+cat output.txt
+exit $status
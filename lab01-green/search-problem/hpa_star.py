@@ -0,0 +1,239 @@
+from collections import deque
+from heapq import heappush, heappop
+from itertools import count
+
+from A_star_problem import manhattan_distance, getClosestFood
+
+# Entrances at least this long get a transition at both ends instead of one in the middle
+LONG_ENTRANCE = 6
+
+
+class HierarchicalGrid:
+    """
+    HPA* abstraction of a grid world. The grid is split into square clusters of cluster_size cells;
+    along every border between two clusters the maximal runs of free cells facing free cells
+    (entrances) get one transition, or two at the ends of long entrances. The transition cells
+    are the nodes of the abstract graph: the two cells of a transition are linked by a move, and
+    the nodes of a cluster by their path costs inside the cluster, computed on the first search
+    entering the cluster and cached. Blocks can be added and removed: only the borders of the
+    cluster of the cell are rescanned and the caches of the clusters next to them dropped.
+    """
+    def __init__(self, grid, cluster_size=10):
+        self.grid = grid
+        self.width, self.height = grid.width, grid.height
+        self.cluster_size = cluster_size
+        self.free = grid.free.tolist() # free[x][y], kept up to date by add_block and remove_block
+        self.directions = {action.value: action for action in grid.actions}
+        self.transitions = {} # border -> list of (cell, cell on the other side)
+        self.links = {}       # node -> set of the nodes across a border
+        self.edges = {}       # cluster -> {node: {node: path cost inside the cluster}}
+        self.expanded = 0     # abstract nodes and cells expanded by the searches
+        self.cached = 0       # cells expanded computing the path costs inside the clusters
+        self.clusters_x = -(-self.width // cluster_size)
+        self.clusters_y = -(-self.height // cluster_size)
+        for cx in range(self.clusters_x):
+            for cy in range(self.clusters_y):
+                for border in self.borders((cx, cy)):
+                    if border not in self.transitions:
+                        self.scan_border(border)
+
+    def cluster(self, cell):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def bounds(self, cluster):
+        size = self.cluster_size
+        return (cluster[0] * size, min((cluster[0] + 1) * size, self.width),
+                cluster[1] * size, min((cluster[1] + 1) * size, self.height))
+
+    def borders(self, cluster):
+        """The borders of a cluster as (axis, lower cluster): axis 0 is the border towards +x"""
+        cx, cy = cluster
+        borders = []
+        if cx + 1 < self.clusters_x:
+            borders.append((0, (cx, cy)))
+        if cx > 0:
+            borders.append((0, (cx - 1, cy)))
+        if cy + 1 < self.clusters_y:
+            borders.append((1, (cx, cy)))
+        if cy > 0:
+            borders.append((1, (cx, cy - 1)))
+        return borders
+
+    def scan_border(self, border):
+        """Find the entrances of a border and replace its transitions"""
+        for a, b in self.transitions.get(border, ()):
+            self.links[a].discard(b)
+            self.links[b].discard(a)
+        axis, (cx, cy) = border
+        x0, x1, y0, y1 = self.bounds((cx, cy))
+        if axis == 0:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+        transitions, run = [], []
+        for pair in pairs + [None]:
+            if pair is not None and self.free[pair[0][0]][pair[0][1]] and self.free[pair[1][0]][pair[1][1]]:
+                run.append(pair)
+                continue
+            if len(run) >= LONG_ENTRANCE:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        self.transitions[border] = transitions
+        for a, b in transitions:
+            self.links.setdefault(a, set()).add(b)
+            self.links.setdefault(b, set()).add(a)
+
+    def nodes(self, cluster):
+        nodes = set()
+        for border in self.borders(cluster):
+            for pair in self.transitions[border]:
+                nodes.update(cell for cell in pair if self.cluster(cell) == cluster)
+        return nodes
+
+    def local_search(self, source, cluster, targets=None):
+        """
+        Breadth-first search from source inside the cluster. Returns the path costs and the parents
+        of the reached cells; with targets it stops once all of them are reached.
+        """
+        x0, x1, y0, y1 = self.bounds(cluster)
+        free, directions = self.free, self.directions
+        distance, parent = {source: 0}, {source: None}
+        remaining = set(targets) - {source} if targets is not None else None
+        queue = deque([source])
+        while queue and remaining != set():
+            cell = queue.popleft()
+            self.expanded += 1
+            for dx, dy in directions:
+                x, y = cell[0] + dx, cell[1] + dy
+                if x0 <= x < x1 and y0 <= y < y1 and free[x][y] and (x, y) not in distance:
+                    distance[(x, y)] = distance[cell] + 1
+                    parent[(x, y)] = cell
+                    queue.append((x, y))
+                    if remaining is not None:
+                        remaining.discard((x, y))
+        return distance, parent
+
+    def cluster_edges(self, cluster):
+        edges = self.edges.get(cluster)
+        if edges is None:
+            nodes = self.nodes(cluster)
+            edges = {}
+            expanded = self.expanded
+            for node in nodes:
+                distance, _ = self.local_search(node, cluster, nodes)
+                edges[node] = {other: distance[other] for other in nodes if other != node and other in distance}
+            self.cached += self.expanded - expanded
+            self.expanded = expanded
+            self.edges[cluster] = edges
+        return edges
+
+    def search(self, start, goal):
+        """Return the list of actions of a path from start to goal, or None if there is none"""
+        if start == goal:
+            return []
+        start_cluster, goal_cluster = self.cluster(start), self.cluster(goal)
+        start_nodes = self.nodes(start_cluster)
+        goal_nodes = self.nodes(goal_cluster)
+        distance, _ = self.local_search(start, start_cluster, start_nodes | {goal})
+        # temporary edges of start and goal, the graph itself is left untouched
+        start_edges = {node: distance[node] for node in start_nodes if node in distance}
+        if goal in distance:
+            start_edges[goal] = distance[goal]
+        distance, _ = self.local_search(goal, goal_cluster, goal_nodes)
+        to_goal = {node: distance[node] for node in goal_nodes if node in distance}
+
+        counter = count()
+        frontier = [(manhattan_distance(start, goal), next(counter), 0, start)]
+        cost, parent = {start: 0}, {start: None}
+        while frontier:
+            _, _, node_cost, node = heappop(frontier)
+            if node == goal:
+                break
+            if node_cost > cost[node]:
+                continue # a cheaper path to this node was already expanded
+            self.expanded += 1
+            if node == start:
+                successors = list(start_edges.items())
+            else:
+                successors = list(self.cluster_edges(self.cluster(node)).get(node, {}).items())
+                if node in to_goal:
+                    successors.append((goal, to_goal[node]))
+            successors += [(other, 1) for other in self.links.get(node, ())]
+            for other, step in successors:
+                new_cost = cost[node] + step
+                if new_cost < cost.get(other, new_cost + 1):
+                    cost[other] = new_cost
+                    parent[other] = node
+                    heappush(frontier, (new_cost + manhattan_distance(other, goal), next(counter), new_cost, other))
+        if goal not in parent:
+            return None
+        abstract_path = [goal]
+        while parent[abstract_path[-1]] is not None:
+            abstract_path.append(parent[abstract_path[-1]])
+        abstract_path.reverse()
+        return self.refine(abstract_path)
+
+    def refine(self, abstract_path):
+        """Turn a path of abstract nodes into moves, searching inside a cluster only for its segments"""
+        actions = []
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            if b in self.links.get(a, ()):
+                actions.append(self.directions[(b[0] - a[0], b[1] - a[1])])
+                continue
+            _, parent = self.local_search(a, self.cluster(a), [b])
+            segment, cell = [], b
+            while parent[cell] is not None:
+                previous = parent[cell]
+                segment.append(self.directions[(cell[0] - previous[0], cell[1] - previous[1])])
+                cell = previous
+            actions += reversed(segment)
+        return actions
+
+    def set_free(self, cell, free):
+        x, y = cell
+        if self.free[x][y] == free:
+            return
+        self.free[x][y] = free
+        cluster = self.cluster(cell)
+        self.edges.pop(cluster, None)
+        for border in self.borders(cluster):
+            self.scan_border(border)
+            for other in (border[1], (border[1][0] + 1 - border[0], border[1][1] + border[0])):
+                self.edges.pop(other, None)
+
+    def add_block(self, cell):
+        self.set_free(cell, False)
+
+    def remove_block(self, cell):
+        self.set_free(cell, True)
+
+    def follow(self, world):
+        """Keep the abstraction up to date with the addBlock and removeBlock calls of a GridWorld"""
+        add_block, remove_block = world.addBlock, world.removeBlock
+        def addBlock(pos):
+            add_block(pos)
+            self.add_block((pos.x, pos.y))
+        def removeBlock(pos):
+            remove_block(pos)
+            self.remove_block((pos.x, pos.y))
+        world.addBlock, world.removeBlock = addBlock, removeBlock
+
+
+def hpa_star_runner(eater_locations,food_locations,actions,list_of_blocks,grid,cluster_size=10,hierarchy=None):
+    """Eat the food going each time to the closest one like A_star_runner, planning with HPA*"""
+    if hierarchy is None:
+        hierarchy = HierarchicalGrid(grid, cluster_size)
+    monkeyActions = []
+    expanded = hierarchy.expanded
+    while len(food_locations) > 0:
+        goal = getClosestFood(eater_locations, food_locations, manhattan_distance)
+        path = hierarchy.search(eater_locations, goal)
+        if path is None:
+            break # the closest food cannot be reached
+        monkeyActions += path
+        food_locations.remove(goal)
+        eater_locations = goal
+    print(f"Total nodes visited: {hierarchy.expanded - expanded}")
+    return monkeyActions
@@ -0,0 +1,88 @@
+import hashlib
+import os
+from math import inf
+
+import numpy as np
+
+
+def map_hash(grid):
+    """Hash of the size and of the blocks of a compiled grid, identifying its landmark sets on disk"""
+    digest = hashlib.sha1(np.array(grid.size, dtype=np.int64).tobytes())
+    digest.update(np.packbits(grid.free).tobytes())
+    return digest.hexdigest()
+
+
+def farthest_landmarks(grid, k, start=None):
+    """
+    Pick k landmarks by farthest-point selection: each new landmark is the free cell with the largest
+    path cost from the landmarks already chosen. Cells unreachable from all of them count as infinitely
+    far, so every connected component gets a landmark before any gets a second one.
+    Returns the landmarks and their distance fields as a (k, cells) int32 array (-1 where unreachable).
+    """
+    free_ids = np.flatnonzero(grid.free)
+    if not free_ids.size:
+        raise ValueError('No free cell for the landmarks')
+    candidate = grid.cell_id(start) if start is not None else int(free_ids[0])
+    nearest = np.full(grid.n_cells, np.iinfo(np.int32).max, dtype=np.int64)
+    landmarks, fields = [], []
+    for _ in range(min(k, free_ids.size)):
+        landmarks.append(grid.cell(candidate))
+        field = grid.distance_field(landmarks[-1])
+        fields.append(field)
+        reached = field >= 0
+        nearest[reached] = np.minimum(nearest[reached], field[reached])
+        nearest[candidate] = -1 # never picked again
+        candidate = int(free_ids[nearest[free_ids].argmax()])
+        if nearest[candidate] <= 0:
+            break # every free cell is a landmark
+    return landmarks, np.stack(fields).astype(np.int32)
+
+
+class LandmarkHeuristic:
+    """
+    ALT heuristic of a static map: with the exact distances d_L from every landmark L, the triangle
+    inequality gives the lower bound max_L |d_L(state) - d_L(goal)| of the path cost from state to
+    goal. Usable as the heuristic_function(state, goal) of A_star_runner; it is consistent, so it is
+    exact along any shortest path passing through a landmark. A state and a goal in different
+    connected components get an infinite estimate.
+    """
+    def __init__(self, grid, landmarks, distances):
+        self.grid = grid
+        self.landmarks = landmarks
+        self.distances = distances # (landmarks, cells) int32, -1 where unreachable
+
+    @classmethod
+    def build(cls, grid, k=8, start=None):
+        return cls(grid, *farthest_landmarks(grid, k, start))
+
+    @classmethod
+    def cached(cls, grid, k=8, directory='landmarks'):
+        """Load the landmark set of the grid saved in directory, computing and saving it if missing"""
+        path = os.path.join(directory, '{}-{}.npz'.format(map_hash(grid), k))
+        if os.path.exists(path):
+            return cls.load(grid, path)
+        heuristic = cls.build(grid, k)
+        os.makedirs(directory, exist_ok=True)
+        heuristic.save(path)
+        return heuristic
+
+    def save(self, path):
+        np.savez_compressed(path, map_hash=map_hash(self.grid), landmarks=np.array(self.landmarks, dtype=np.int64),
+                            distances=self.distances)
+
+    @classmethod
+    def load(cls, grid, path):
+        with np.load(path) as data:
+            if str(data['map_hash']) != map_hash(grid):
+                raise ValueError('The landmarks in {} were computed for another map'.format(path))
+            return cls(grid, [tuple(int(v) for v in landmark) for landmark in data['landmarks']], data['distances'])
+
+    def __call__(self, state, goal):
+        from_state = self.distances[:, self.grid.cell_id(state)]
+        from_goal = self.distances[:, self.grid.cell_id(goal)]
+        if ((from_state < 0) != (from_goal < 0)).any():
+            return inf # one of them is reachable from a landmark and the other is not
+        both = from_state >= 0
+        if not both.any():
+            return 0
+        return int(np.abs(from_state[both] - from_goal[both]).max())
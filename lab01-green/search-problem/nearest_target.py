@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class ShortestPathTree:
+    """
+    Shortest path tree grown from a source cell over a compiled grid.
+    Every move costs 1, so Dijkstra's expansion order is the breadth-first one and the
+    discovered cells are simply kept in a list. Cells are settled in order of path cost and the growth can be paused
+    and resumed, so a tree answers any number of nearest-target queries from its source
+    expanding every cell at most once.
+    """
+    def __init__(self, grid, source):
+        self.grid = grid
+        self.source = source
+        self.distance = np.full(grid.n_cells, -1, dtype=np.int32)
+        self.parent = np.full(grid.n_cells, -1, dtype=np.int64)
+        self.parent_action = np.full(grid.n_cells, -1, dtype=np.int8)
+        self.order = [grid.cell_id(source)] # cells in discovery (= path cost) order
+        self.settled = 0 # cells of order already expanded
+        self.distance[self.order[0]] = 0
+
+    def expand_next(self):
+        """Settle the next cell, returning its id, or None if the tree covers the reachable cells"""
+        if self.settled == len(self.order):
+            return None
+        cell_id = self.order[self.settled]
+        self.settled += 1
+        grid, distance = self.grid, self.distance
+        start, end = grid.indptr[cell_id], grid.indptr[cell_id + 1]
+        for neighbor, code in zip(grid.successor_ids[start:end].tolist(), grid.action_codes[start:end].tolist()):
+            if distance[neighbor] < 0:
+                distance[neighbor] = distance[cell_id] + 1
+                self.parent[neighbor] = cell_id
+                self.parent_action[neighbor] = code
+                self.order.append(neighbor)
+        return cell_id
+
+    def nearest(self, targets):
+        """Return the target with the smallest path cost from the source, or None if none is reachable.
+        Ties are broken by the expansion order."""
+        target_ids = {self.grid.cell_id(t): t for t in targets}
+        # targets settled by previous queries are nearer than any cell still to be settled
+        for cell_id in self.order[:self.settled]:
+            if cell_id in target_ids:
+                return target_ids[cell_id]
+        while True:
+            cell_id = self.expand_next()
+            if cell_id is None:
+                return None
+            if cell_id in target_ids:
+                return target_ids[cell_id]
+
+    def cost(self, target):
+        """Path cost from the source to a target settled by the tree (-1 if not reached yet)"""
+        return int(self.distance[self.grid.cell_id(target)])
+
+    def actions_to(self, target):
+        """The sequence of actions from the source to a reached target"""
+        cell_id, codes = self.grid.cell_id(target), []
+        while self.parent[cell_id] >= 0:
+            codes.append(self.parent_action[cell_id])
+            cell_id = self.parent[cell_id]
+        return [self.grid.actions[code] for code in reversed(codes)]
+
+
+def nearest_food_runner(eater_locations,food_locations,actions,list_of_blocks,grid):
+    """
+    Eat the food going each time to the nearest one by real path cost. A single tree is grown
+    from every position of the eater and stops at the first food it settles.
+    """
+    monkeyActions = []
+    totalCounter = 0
+    while len(food_locations) > 0:
+        tree = ShortestPathTree(grid, eater_locations)
+        food = tree.nearest(food_locations)
+        totalCounter += tree.settled
+        if food is None:
+            break # the remaining food cannot be reached
+        monkeyActions += tree.actions_to(food)
+        food_locations.remove(food)
+        eater_locations = food
+    print(f"Total nodes visited: {totalCounter}")
+    return monkeyActions
@@ -1,3 +1,4 @@
+from array import array
 import numpy as np
 
 
@@ -11,20 +12,17 @@ class Problem:
     actions and result, and possibly __init__, goal_test, and path_cost. Then you will create instances
     of your subclass and solve them with the various search functions."""
 
-    def __init__(self, initial, goal, available_actions, list_of_blocks):
+    def __init__(self, initial, goal, available_actions, list_of_blocks, grid):
         self.initial = initial
         self.goal = goal
         self.list_of_blocks=list_of_blocks
         self.available_actions=available_actions
-        
+        #The compiled grid is built once per world (CompiledGrid.from_world) and shared by the problems
+        self.grid = grid
 
+    #Returns the precomputed (neighbor, action) pairs of the node position
     def actions(self, node):
-        available_neighbors=[]
-        for action in self.available_actions:
-            neighbor=tuple(map(np.add, node.state, action.value))
-            if self.is_valid(neighbor):
-                available_neighbors.append({'neighbor':neighbor,'action':action})
-        return available_neighbors
+        return self.grid.successors(node.state)
 
     def result(self, state, action): # The result of applying an action
         return action
@@ -34,27 +32,119 @@ class Problem:
 
     def path_cost(self, path_cost,state)->int:
         return 1
+
+    #Estimate of the cost from state to the goal, stored in the nodes separately from the path cost
+    def h(self, state):
+        return 0
     
     def is_valid(self,new_pos): 
-        return (new_pos not in self.list_of_blocks and
-        new_pos[0]<=15 and new_pos[0]>=0 
-        and new_pos[1]>=0 and new_pos[1]<=15)
+        return self.grid.is_free(new_pos)
     
     
 
 
+class NodePool:
+    """
+    Storage for the nodes of a search. Stored nodes are rows of parallel typed arrays
+    (state id, parent index, action code, path cost, depth) and Node objects are only
+    views over them: a node gets its row when it is expanded, since only parents have
+    to outlive the frontier, so the search tree costs a few bytes per expanded node.
+    States are encoded with the cell ids of the grid, or interned when there is none.
+    """
+    def __init__(self, grid=None):
+        self.grid = grid
+        self.actions = list(grid.actions) if grid is not None else []
+        self.action_codes = {action: code for code, action in enumerate(self.actions)}
+        self.states = []
+        self.state_codes = {}
+        self.state_ids = array('q')
+        self.parents = array('q')
+        self.action_ids = array('h')
+        self.path_costs = array('d')
+        self.depths = array('l')
+
+    def add(self, state, parent, action_code, path_cost, depth):
+        """Store a new node and return its index, parent is the index of the parent node or -1"""
+        self.state_ids.append(self.encode_state(state))
+        self.parents.append(parent)
+        self.action_ids.append(action_code)
+        self.path_costs.append(path_cost)
+        self.depths.append(depth)
+        return len(self.parents) - 1
+
+    def encode_state(self, state):
+        if self.grid is not None:
+            return self.grid.cell_id(state)
+        code = self.state_codes.get(state)
+        if code is None:
+            code = self.state_codes[state] = len(self.states)
+            self.states.append(state)
+        return code
+
+    def decode_state(self, code):
+        return self.grid.cell(code) if self.grid is not None else self.states[code]
+
+    def encode_action(self, action):
+        if action is None:
+            return -1
+        code = self.action_codes.get(action)
+        if code is None:
+            code = self.action_codes[action] = len(self.actions)
+            self.actions.append(action)
+        return code
+
+    def decode_action(self, code):
+        return self.actions[code] if code >= 0 else None
+
+    def view(self, index):
+        """Return a Node viewing the stored node at index"""
+        node = Node.__new__(Node)
+        node.pool = self
+        node.index = index
+        node.state = self.decode_state(self.state_ids[index])
+        node.parent_index = self.parents[index]
+        node.action_code = self.action_ids[index]
+        node.path_cost = self.path_costs[index]
+        node.depth = self.depths[index]
+        node.h = 0
+        return node
+
+    def __len__(self):
+        return len(self.parents)
+
+
 class Node:
     """
-    A node in the search tree
+    A node in the search tree, a lightweight view over a NodePool: the parent is
+    referenced by its index in the pool and the action by its code
     """
-    def __init__(self, state, parent=None, action=None, path_cost=0):
+    __slots__ = ('pool', 'index', 'state', 'parent_index', 'action_code', 'path_cost', 'depth', 'h')
+
+    def __init__(self, state, parent=None, action=None, path_cost=0, pool=None, h=0):
+        if pool is None:
+            pool = parent.pool if parent is not None else NodePool()
+        self.pool = pool
+        self.index = -1 # row in the pool, assigned by store()
         self.state = state
-        self.parent = parent
-        self.action = action # action from parent to this node
+        self.parent_index = parent.store() if parent is not None else -1
+        self.action_code = pool.encode_action(action)
         self.path_cost = path_cost
-        self.depth = 0
-        if parent:
-            self.depth = parent.depth + 1
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.h = h
+
+    def store(self):
+        """Save the node in its pool, if not done yet, and return its index"""
+        if self.index < 0:
+            self.index = self.pool.add(self.state, self.parent_index, self.action_code, self.path_cost, self.depth)
+        return self.index
+
+    @property
+    def parent(self):
+        return self.pool.view(self.parent_index) if self.parent_index >= 0 else None
+
+    @property
+    def action(self): # action from parent to this node
+        return self.pool.decode_action(self.action_code)
 
     def __repr__(self):
         return '(state:'+str(self.state)+" action: "+str(self.action)+" depth: "+str(self.depth)+' Path_cost: '+str(self.path_cost)+")"
@@ -66,25 +156,34 @@ class Node:
         return [self.child_node(problem, action)
                 for action in problem.actions(self)]
 
-    def child_node(self, problem, action):
-        next_state = problem.result(self.state, action['neighbor'])
-        next_node = Node(state=next_state, parent=self, action=action['action'], 
-                         path_cost=problem.path_cost(self.path_cost,next_state))
+    def child_node(self, problem, move):
+        neighbor, action = move
+        next_state = problem.result(self.state, neighbor)
+        next_node = Node(state=next_state, parent=self, action=action, 
+                         path_cost=problem.path_cost(self.path_cost,next_state),
+                         h=problem.h(next_state))
         return next_node
 
     # Returns a set of actions
     def solution(self):
-        return [node.action for node in self.path()[1:]]
-
+        pool, codes, index = self.pool, [], self.parent_index
+        if index >= 0:
+            codes.append(self.action_code)
+        while index >= 0 and pool.parents[index] >= 0:
+            codes.append(pool.action_ids[index])
+            index = pool.parents[index]
+        return [pool.decode_action(code) for code in reversed(codes)]
+
+    #Rebuilds the path following the parent indexes in the pool
     def path(self):
-        node, path_back = self, []
-        while node:
-            path_back.append(node)
-            node = node.parent
+        path_back, index = [self], self.parent_index
+        while index >= 0:
+            path_back.append(self.pool.view(index))
+            index = self.pool.parents[index]
         return list(reversed(path_back))
 
     def __eq__(self, other):
         return isinstance(other, Node) and self.state == other.state
 
     def __hash__(self):
-        return hash(self.state)
\ No newline at end of file
+        return hash(self.state)
@@ -16,8 +16,26 @@ from A_star_problem import A_star_runner, manhattan_distance, euclidean_distance
 
 from wumpus import OfflinePlayer, run_episode, Eater, EaterWorld, Food
 from Dfs_problem import dfs_runner, iterative_deepening_runner
+from Ida_star_problem import ida_star_runner
+from Ara_star_problem import ara_star_runner
+from Jps_problem import jps_runner
+from hpa_star import hpa_star_runner
+from compiled_grid import CompiledGrid
+from distance_heuristic import DistanceHeuristic
+from landmarks import LandmarkHeuristic
+from search_algorithms import SearchStats
+from nearest_target import nearest_food_runner
+from tour import tour_runner
 
 class GeneralSearchPlayer(OfflinePlayer):
+    # Seconds the anytime players may spend improving their plan, None for their default
+    time_budget = None
+
+    def __init__(self, name: str = None, time_budget: float = None):
+        super().__init__(name)
+        if time_budget is not None:
+            self.time_budget = time_budget
+
     def _say(self, text: str):
         print(self.name + ' says: ' + text)
 
@@ -26,6 +44,8 @@ class GeneralSearchPlayer(OfflinePlayer):
         self._say('Episode starting for player {}'.format(self.name))
 
         food_locations, eater_location, all_actions, block_locations = self.inspect_world(world)
+        self.grid = CompiledGrid.from_world(world, all_actions)
+        self.stats = SearchStats() # filled in by the players using graph_search
 
         self._say('Actions : {}'.format(all_actions))
         self._say('World size: {}x{}'.format(world.size.x, world.size.y))
@@ -35,6 +55,8 @@ class GeneralSearchPlayer(OfflinePlayer):
         self._say('Available actions: {}'.format({a.name: a.value for a in all_actions}))
 
         solution = self.search(eater_location, food_locations, all_actions, block_locations)
+        if self.stats.searches:
+            self._say('Search statistics: {}'.format(self.stats))
         return solution
 
     def end_episode(self, outcome: int, alive: bool, success: bool):
@@ -57,24 +79,66 @@ class GeneralSearchPlayer(OfflinePlayer):
 
 class UCSPlayer(GeneralSearchPlayer):
     def search(self, eater_location, food_locations, all_actions, block_locations):
-        return ucs_runner(eater_location, food_locations, all_actions, block_locations)
+        return ucs_runner(eater_location, food_locations, all_actions, block_locations, self.grid, self.stats)
 
 class AStarManhattanPlayer(GeneralSearchPlayer):
     def search(self, eater_location, food_locations, all_actions, block_locations):
-        return A_star_runner(eater_location, food_locations, all_actions, block_locations,manhattan_distance)
+        return A_star_runner(eater_location, food_locations, all_actions, block_locations,manhattan_distance, self.grid, self.stats)
 
 class AStarEuclideanPlayer(GeneralSearchPlayer):
     def search(self, eater_location, food_locations, all_actions, block_locations):
-        return A_star_runner(eater_location, food_locations, all_actions, block_locations,euclidean_distance)
+        return A_star_runner(eater_location, food_locations, all_actions, block_locations,euclidean_distance, self.grid, self.stats)
+
+class AStarDistancePlayer(GeneralSearchPlayer):
+    def search(self, eater_location, food_locations, all_actions, block_locations):
+        return A_star_runner(eater_location, food_locations, all_actions, block_locations,DistanceHeuristic(self.grid), self.grid, self.stats)
+
+class AStarLandmarkPlayer(GeneralSearchPlayer):
+    def search(self, eater_location, food_locations, all_actions, block_locations):
+        return A_star_runner(eater_location, food_locations, all_actions, block_locations,LandmarkHeuristic.cached(self.grid), self.grid, self.stats)
 
 class IterativeDeepeningPlayer(GeneralSearchPlayer):
     def search(self, eater_location, food_locations, all_actions, block_locations):
-        return iterative_deepening_runner(eater_location, food_locations, all_actions, block_locations)
+        return iterative_deepening_runner(eater_location, food_locations, all_actions, block_locations, self.grid, self.stats)
+
+class IDAStarPlayer(GeneralSearchPlayer):
+    def search(self, eater_location, food_locations, all_actions, block_locations):
+        return ida_star_runner(eater_location, food_locations, all_actions, block_locations, manhattan_distance, self.grid)
+
+class ARAStarPlayer(GeneralSearchPlayer):
+    time_budget = 1.0
+
+    def search(self, eater_location, food_locations, all_actions, block_locations):
+        return ara_star_runner(eater_location, food_locations, all_actions, block_locations, manhattan_distance, self.grid, self.time_budget)
+
+class JPSPlayer(GeneralSearchPlayer):
+    def search(self, eater_location, food_locations, all_actions, block_locations):
+        return jps_runner(eater_location, food_locations, all_actions, block_locations, manhattan_distance, self.grid, self.stats)
+
+class HPAStarPlayer(GeneralSearchPlayer):
+    def search(self, eater_location, food_locations, all_actions, block_locations):
+        return hpa_star_runner(eater_location, food_locations, all_actions, block_locations, self.grid)
+
+class NearestFoodPlayer(GeneralSearchPlayer):
+    def search(self, eater_location, food_locations, all_actions, block_locations):
+        return nearest_food_runner(eater_location, food_locations, all_actions, block_locations, self.grid)
+
+class TourPlayer(GeneralSearchPlayer):
+    def search(self, eater_location, food_locations, all_actions, block_locations):
+        return tour_runner(eater_location, food_locations, all_actions, block_locations, self.grid)
 
 #gridrunner --world EaterWorld --entry solver:AStarEuclideanPlayer --horizon 200 worlds/eater-world_5.json
 #gridrunner --world EaterWorld --entry solver:AStarManhattanPlayer --horizon 200 worlds/eater-world_5.json
+#gridrunner --world EaterWorld --entry solver:AStarDistancePlayer --horizon 200 worlds/eater-world_5.json
+#gridrunner --world EaterWorld --entry solver:AStarLandmarkPlayer --horizon 200 worlds/eater-world_5.json
 #gridrunner --world EaterWorld --entry solver:IterativeDeepeningPlayer --horizon 200 worlds/eater-world_5.json
+#gridrunner --world EaterWorld --entry solver:IDAStarPlayer --horizon 200 worlds/eater-world_5.json
+#gridrunner --world EaterWorld --entry solver:ARAStarPlayer --horizon 200 worlds/eater-world_5.json
+#gridrunner --world EaterWorld --entry solver:JPSPlayer --horizon 200 worlds/eater-world_5.json
+#gridrunner --world EaterWorld --entry solver:HPAStarPlayer --horizon 200 worlds/eater-world_5.json
 #gridrunner --world EaterWorld --entry solver:UCSPlayer --horizon 200 worlds/eater-world_5.json
+#gridrunner --world EaterWorld --entry solver:NearestFoodPlayer --horizon 200 worlds/eater-world_5.json
+#gridrunner --world EaterWorld --entry solver:TourPlayer --horizon 200 worlds/eater-world_5.json
 
 
 MAP_STR = """
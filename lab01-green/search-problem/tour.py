@@ -0,0 +1,177 @@
+import numpy as np
+
+# Largest number of foods for which the exact Held-Karp solver is used
+HELD_KARP_LIMIT = 15
+
+
+class DistanceOracle:
+    """
+    All-pairs path costs between a set of points (the eater and the food) of a compiled grid.
+    One BFS wavefront is propagated from every point with CompiledGrid.distance_field; the
+    matrix of the costs between the points is kept, while the distance fields, needed to
+    rebuild the paths, are cached only while they fit in max_bytes.
+    """
+    def __init__(self, grid, points, max_bytes=256 * 2**20):
+        self.grid = grid
+        self.points = list(points)
+        self.ids = [grid.cell_id(p) for p in self.points]
+        self.fields = {}
+        cache_fields = len(self.points) * grid.n_cells * 4 <= max_bytes
+        self.matrix = np.empty((len(self.points), len(self.points)), dtype=np.int32)
+        for j, point in enumerate(self.points):
+            field = grid.distance_field(point)
+            self.matrix[:, j] = field[self.ids]
+            if cache_fields:
+                self.fields[j] = field
+
+    def field(self, j):
+        field = self.fields.get(j)
+        return field if field is not None else self.grid.distance_field(self.points[j])
+
+    def path(self, i, j):
+        """Return the actions and the cells of a shortest path from point i to point j"""
+        grid, field = self.grid, self.field(j)
+        cell_id, actions, cells = self.ids[i], [], []
+        while field[cell_id] > 0:
+            start, end = grid.indptr[cell_id], grid.indptr[cell_id + 1]
+            for neighbor, code in zip(grid.successor_ids[start:end], grid.action_codes[start:end]):
+                if field[neighbor] == field[cell_id] - 1:
+                    break
+            actions.append(grid.actions[code])
+            cells.append(grid.cell(neighbor))
+            cell_id = neighbor
+        return actions, cells
+
+
+def held_karp(matrix):
+    """
+    Exact shortest open tour from point 0 through all the other points of the cost matrix,
+    by dynamic programming over the subsets of visited points (one NumPy step per subset).
+    """
+    n = len(matrix) - 1
+    if n == 0:
+        return [0]
+    costs = matrix[1:, 1:].astype(np.int64)
+    INF = np.iinfo(np.int64).max // 4
+    best = np.full((1 << n, n), INF, dtype=np.int64) # best[subset, last point]
+    previous = np.full((1 << n, n), -1, dtype=np.int8)
+    for j in range(n):
+        best[1 << j, j] = matrix[0, j + 1]
+    everything = (1 << n) - 1
+    for subset in range(1, everything):
+        row = best[subset]
+        inside = row < INF
+        if not inside.any():
+            continue
+        candidates = row[inside, None] + costs[inside]
+        argmin = candidates.argmin(axis=0)
+        extended = candidates[argmin, np.arange(n)]
+        last = np.flatnonzero(inside)[argmin]
+        for j in range(n):
+            if subset & (1 << j):
+                continue
+            target = subset | (1 << j)
+            if extended[j] < best[target, j]:
+                best[target, j] = extended[j]
+                previous[target, j] = last[j]
+    order, subset, j = [], everything, int(best[everything].argmin())
+    while j >= 0:
+        order.append(j + 1)
+        subset, j = subset & ~(1 << j), int(previous[subset, j])
+    return [0] + order[::-1]
+
+
+def tour_cost(matrix, order):
+    return int(sum(matrix[a, b] for a, b in zip(order, order[1:])))
+
+
+def nearest_neighbour_tour(matrix):
+    """Open tour from point 0 always moving to the nearest unvisited point"""
+    unvisited = set(range(1, len(matrix)))
+    order = [0]
+    while unvisited:
+        nearest = min(unvisited, key=lambda j: matrix[order[-1], j])
+        order.append(nearest)
+        unvisited.remove(nearest)
+    return order
+
+
+def improve_tour(matrix, order):
+    """
+    Local search on an open tour with a fixed first point: 2-opt segment reversals and
+    Or-opt moves of segments of 1 to 3 points, until no move shortens the tour.
+    """
+    order = list(order)
+    d = matrix.tolist()
+    improved = True
+    while improved:
+        improved = False
+        n = len(order)
+        # 2-opt: reverse order[i..j]
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                a, b, c = order[i - 1], order[i], order[j]
+                delta = d[a][c] - d[a][b]
+                if j + 1 < n:
+                    delta += d[b][order[j + 1]] - d[c][order[j + 1]]
+                if delta < 0:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+        # Or-opt: move order[i..i+length-1] after another point
+        for length in (1, 2, 3):
+            for i in range(1, n - length + 1):
+                segment = order[i:i + length]
+                before, after = order[i - 1], order[i + length] if i + length < n else None
+                removed = d[before][segment[0]] - (d[before][after] if after is not None else 0)
+                if after is not None:
+                    removed += d[segment[-1]][after]
+                rest = order[:i] + order[i + length:]
+                for k in range(len(rest)):
+                    if k == i - 1:
+                        continue
+                    p, q = rest[k], rest[k + 1] if k + 1 < len(rest) else None
+                    for piece in (segment, segment[::-1]):
+                        added = d[p][piece[0]] - (d[p][q] if q is not None else 0)
+                        if q is not None:
+                            added += d[piece[-1]][q]
+                        if added < removed:
+                            order = rest[:k + 1] + piece + rest[k + 1:]
+                            improved = True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return order
+
+
+def solve_tour(matrix):
+    """Order in which to visit the points of the cost matrix starting from point 0"""
+    if len(matrix) - 1 <= HELD_KARP_LIMIT:
+        return held_karp(matrix)
+    return improve_tour(matrix, nearest_neighbour_tour(matrix))
+
+
+def tour_runner(eater_locations,food_locations,actions,list_of_blocks,grid):
+    """
+    Plan the shortest sequence of moves eating all the reachable food: the path costs between
+    the eater and every food come from a DistanceOracle and the visiting order from solve_tour.
+    """
+    oracle = DistanceOracle(grid, [eater_locations] + list(food_locations))
+    reachable = [0] + [j for j in range(1, len(oracle.points)) if oracle.matrix[0, j] >= 0]
+    order = [reachable[k] for k in solve_tour(oracle.matrix[np.ix_(reachable, reachable)])]
+    print(f"Tour cost: {tour_cost(oracle.matrix, order)}, distance fields: {len(oracle.points)}")
+
+    monkeyActions = []
+    eaten = set()
+    current = 0
+    for j in order[1:]:
+        if oracle.points[j] in eaten: # eaten on the way to another food
+            continue
+        path, cells = oracle.path(current, j)
+        monkeyActions += path
+        eaten.update(cells)
+        current = j
+    return monkeyActions
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+
+"""
+Procedural EaterWorld generator for large benchmark worlds.
+
+The layouts are built on a NumPy occupancy bitmap: open fields with random blocks, rooms joined
+by doors like MAP_STR, and mazes. The eater is placed on a free cell and a connectivity pass
+(a BFS wavefront of the compiled grid) keeps only the cells it can reach, so all the food is
+reachable. The same layout, size and seed always give the same world.
+
+    python world_generator.py --layout rooms --size 200 --seeds 0-9 --out worlds/generated
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from compiled_grid import CompiledGrid
+
+# The eater moves, enough to compile the grid without the wumpus package
+Move = namedtuple('Move', 'name value')
+MOVES = (Move('N', (0, 1)), Move('S', (0, -1)), Move('E', (1, 0)), Move('W', (-1, 0)))
+
+
+def open_layout(rng, width, height, density=0.1):
+    """Free field with a fraction density of the cells blocked at random"""
+    return rng.random((width, height)) >= density
+
+
+def rooms_layout(rng, width, height, room_size=4, door_width=1, door_probability=0.8):
+    """
+    Square rooms of room_size cells separated by one cell thick walls, with an outer wall.
+    Every wall between two rooms has a door of door_width cells with door_probability.
+    """
+    step = room_size + 1
+    x, y = np.arange(width), np.arange(height)
+    wall_x = (x % step == 0) | (x == width - 1)
+    wall_y = (y % step == 0) | (y == height - 1)
+    free = ~(wall_x[:, None] | wall_y[None, :])
+    # the rooms are the runs of cells between two walls along each axis
+    for free_t, walls, other_walls in ((free, x[wall_x], y[wall_y]), (free.T, y[wall_y], x[wall_x])):
+        starts, ends = other_walls[:-1] + 1, other_walls[1:] # room cells along the wall: [start, end)
+        keep = ends > starts
+        starts, ends = starts[keep], ends[keep]
+        inner = walls[(walls > 0) & (walls < free_t.shape[0] - 1)]
+        if not inner.size or not starts.size:
+            continue
+        wall, start = np.meshgrid(inner, starts, indexing='ij')
+        end = np.broadcast_to(ends, wall.shape)
+        span = np.maximum(end - start - door_width + 1, 1)
+        door = start + (rng.random(wall.shape) * span).astype(np.int64)
+        opened = rng.random(wall.shape) < door_probability
+        for offset in range(door_width):
+            cells = np.minimum(door + offset, end - 1)
+            free_t[wall[opened], cells[opened]] = True
+    return free
+
+
+def maze_layout(rng, width, height, braid=0.0):
+    """
+    Perfect maze on the cells with odd coordinates, carved with the binary tree algorithm (each
+    cell opens towards east or north at random), then a fraction braid of the remaining walls
+    between two cells is removed to add loops.
+    """
+    free = np.zeros((width, height), dtype=bool)
+    nx, ny = (width - 1) // 2, (height - 1) // 2
+    if nx < 1 or ny < 1:
+        return free
+    free[1:2 * nx:2, 1:2 * ny:2] = True
+    east = rng.random((nx, ny)) < 0.5
+    east[:, ny - 1] = True  # the last row can only open east
+    east[nx - 1, :] = False # the last column can only open north
+    north = ~east
+    north[nx - 1, ny - 1] = False
+    i, j = np.nonzero(east)
+    free[2 * i + 2, 2 * j + 1] = True
+    i, j = np.nonzero(north)
+    free[2 * i + 1, 2 * j + 2] = True
+    if braid > 0:
+        walls = np.zeros((width, height), dtype=bool)
+        walls[2:2 * nx - 1:2, 1:2 * ny:2] = True
+        walls[1:2 * nx:2, 2:2 * ny - 1:2] = True
+        walls &= ~free
+        free |= walls & (rng.random((width, height)) < braid)
+    return free
+
+
+LAYOUTS = {'open': open_layout, 'rooms': rooms_layout, 'maze': maze_layout}
+
+
+class GeneratedWorld:
+    """An EaterWorld description: the occupancy bitmap free[x, y], the eater and the food"""
+    def __init__(self, free, eater, food):
+        self.free = free
+        self.eater = eater
+        self.food = food
+
+    @property
+    def size(self):
+        return self.free.shape
+
+    def to_dict(self):
+        """Description in the format of EaterWorld.from_dict, with a map for dense worlds"""
+        width, height = self.size
+        desc = {}
+        blocks = np.argwhere(~self.free)
+        if len(blocks) < 0.1 * width * height:
+            desc['size'] = [width, height]
+            if len(blocks):
+                desc['block'] = blocks.tolist()
+        else:
+            chars = np.where(self.free, ord('.'), ord('#')).astype(np.uint8)
+            desc['map'] = '\n'.join(row.tobytes().decode() for row in chars.T[::-1])
+        desc['eater'] = list(self.eater)
+        desc['food'] = [list(f) for f in self.food]
+        return desc
+
+    def to_JSON(self, fp):
+        json.dump(self.to_dict(), fp)
+
+    def to_world(self):
+        from wumpus import EaterWorld
+        return EaterWorld.from_dict(self.to_dict())
+
+
+def generate_world(layout='rooms', size=(64, 64), seed=0, food=0.05, fill_unreachable=True, **options):
+    """
+    Generate a world with the given layout (open, rooms or maze) and size; the options are
+    passed to the layout function. The food is a fraction of the free cells reachable by the
+    eater or, if at least 1, the number of food cells. With fill_unreachable the cells the eater
+    cannot reach are blocked too, so the whole world is connected.
+    """
+    width, height = (size, size) if isinstance(size, int) else size
+    rng = np.random.default_rng(seed)
+    free = LAYOUTS[layout](rng, width, height, **options)
+    free_ids = np.flatnonzero(free)
+    if not free_ids.size:
+        raise ValueError('No free cell for the eater in the generated world')
+    eater_id = int(rng.choice(free_ids))
+
+    grid = CompiledGrid((width, height), (), MOVES, free=free)
+    reachable = grid.distance_field(grid.cell(eater_id)) >= 0
+    if fill_unreachable:
+        free &= reachable.reshape(free.shape)
+    candidates = np.flatnonzero(reachable)
+    candidates = candidates[candidates != eater_id]
+    amount = int(food) if food >= 1 else int(food * candidates.size)
+    food_ids = rng.choice(candidates, size=min(amount, candidates.size), replace=False)
+    return GeneratedWorld(free, grid.cell(eater_id), [grid.cell(i) for i in np.sort(food_ids)])
+
+
+def parse_seeds(text):
+    """Seeds given as a list of numbers and ranges, e.g. 0-99,200"""
+    seeds = []
+    for part in text.split(','):
+        first, _, last = part.partition('-')
+        seeds += range(int(first), int(last or first) + 1)
+    return seeds
+
+
+def main(*args):
+    parser = argparse.ArgumentParser(description='Generate EaterWorld JSON files')
+    parser.add_argument('--layout', choices=sorted(LAYOUTS), default='rooms')
+    parser.add_argument('--size', type=int, nargs='+', default=[64], help='width [height]')
+    parser.add_argument('--seeds', default='0', help='seeds of the worlds, e.g. 0-99,200')
+    parser.add_argument('--food', type=float, default=0.05, help='fraction of the reachable cells, or number if >= 1')
+    parser.add_argument('--out', default='.', help='directory of the generated files')
+    options = parser.parse_args(args)
+
+    size = tuple(options.size * 2)[:2]
+    os.makedirs(options.out, exist_ok=True)
+    for seed in parse_seeds(options.seeds):
+        world = generate_world(options.layout, size, seed, options.food)
+        path = os.path.join(options.out, '{}-{}x{}-{}.json'.format(options.layout, size[0], size[1], seed))
+        with open(path, 'w') as fp:
+            world.to_JSON(fp)
+        print('{}: {} food'.format(path, len(world.food)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
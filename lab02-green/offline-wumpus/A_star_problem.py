@@ -1,41 +1,77 @@
+from heapq import heapify
+from math import inf
+from time import perf_counter
 import numpy as np
-from search_problem import Problem
+from search_problem import Problem, OrientedGrid, DIRECTIONS
 from search_algorithms import *
-from utility_functions import getClosestGold
+from utility_functions import getClosestGold, distance_field, manhattan_distance
 
 #AStar_problem class which extends the generic Problem class and defines methods for an informed search
 class A_star_problem(Problem):
     def __init__(self,initial, goal, actions, list_of_blocks, heuristic_function, wumpus, size, includeCostAction):
         self.heuristic_function=heuristic_function
+        #Orientation-aware heuristics (see OrientedHeuristic) also get the direction of the hunter
+        self.oriented = getattr(heuristic_function, 'oriented', False)
         self.wumpus = wumpus
         self.includeCostAction=includeCostAction
         super().__init__(initial,goal, actions, list_of_blocks, size)
+        #The oriented states are packed into integers, see OrientedGrid
+        self.grid = OrientedGrid.compile((int(size[0]), int(size[1])), frozenset((int(x), int(y)) for x, y in list_of_blocks))
+        self.wumpus_bits = {tuple(int(v) for v in cell): 1 << i for i, cell in enumerate(wumpus)}
+        self.wumpus_masks = [self.wumpus_bits[tuple(int(v) for v in cell)] for cell in wumpus]
+        #Line of fire index: fire[pose] is the bitmask of the wumpuses hit by shooting from that pose
+        self.fire = line_of_fire(self.grid, self.wumpus_bits)
+        initial.pose = self.grid.pose(initial.state, initial.direction)
+        initial.key = self.key(initial.pose, initial.killedWumpuses)
+        initial.h = self.h(initial.state, initial.direction)
+
+    #Cells and directions from which a shot hits the given wumpus
+    def shooters(self, wumpus):
+        return [(self.grid.cell(pose), DIRECTIONS[pose & 3]) for pose in shooting_poses(self.grid, wumpus)]
+
+    #Packed search state key of a pose and a list of killed wumpuses
+    def key(self, pose, killedWumpuses):
+        mask = 0
+        for cell in killedWumpuses:
+            mask |= self.wumpus_bits.get((int(cell[0]), int(cell[1])), 0)
+        return mask * self.grid.n_poses + pose
 
     #Given a node calculate its expansion returning the available_neighbors 
     def actions(self, node):
+        grid, pose = self.grid, node.pose
+        killed = node.key - pose #the mask part of the key, the same for all the moves but the shot
         available_neighbors=[]
-        if self.is_valid(moveForward(node)):   
+        forward = grid.forward[pose]
+        if forward >= 0:
             #If given this position is possible to move forward wrt to the current direction add the move action     
-            available_neighbors.append({'neighbor':moveForward(node),
+            available_neighbors.append({'neighbor':grid.cell(forward),
                                         'action':[self.available_actions[0]], 
                                         'direction':node.direction, 
-                                        'killedWumpuses': node.killedWumpuses})
+                                        'killedWumpuses': node.killedWumpuses,
+                                        'pose': forward, 'key': forward + killed})
         #Add left rotation
+        left = grid.left[pose]
         available_neighbors.append({'neighbor':node.state,
                                     'action':[self.available_actions[2]],
-                                    'direction':rotateLeft(node), 
-                                    'killedWumpuses': node.killedWumpuses})
+                                    'direction':DIRECTIONS[left & 3], 
+                                    'killedWumpuses': node.killedWumpuses,
+                                    'pose': left, 'key': left + killed})
         #Add right rotation
+        right = grid.right[pose]
         available_neighbors.append({'neighbor':node.state,
                                     'action':[self.available_actions[1]], 
-                                    'direction':rotateRight(node), 
-                                    'killedWumpuses': node.killedWumpuses})
-        #If there is a wumpus in the neighboring cells shoot it
-        if node.killedWumpuses == []:
+                                    'direction':DIRECTIONS[right & 3], 
+                                    'killedWumpuses': node.killedWumpuses,
+                                    'pose': right, 'key': right + killed})
+        #If there is a wumpus in the line of fire shoot it (a shot hitting nothing would only lead back to this state)
+        hit = self.fire[pose]
+        if hit and node.killedWumpuses == []:
+            killedWumpuses = [cell for cell, bit in zip(self.wumpus, self.wumpus_masks) if hit & bit]
             available_neighbors.append({'neighbor':node.state,
                                         'action':[self.available_actions[3]], 
                                         'direction':node.direction, 
-                                        'killedWumpuses': killWumpuses(node, self.wumpus, self.size[0], self.size[1])})
+                                        'killedWumpuses': killedWumpuses,
+                                        'pose': pose, 'key': hit * grid.n_poses + pose})
         return available_neighbors
         
 
@@ -48,10 +84,15 @@ class A_star_problem(Problem):
             return (len(actions)-1)+10 if 3 in actions_value else len(actions)
         return 10 if 3 in actions_value else 0
     
-    #Function that calculates the cost of a given path
-    def path_cost(self, path_cost, state, actions)->int:
-        # Adds the cost of the path so far with the cost of the heuristic_function which estimates the cost from that node to the goal
-        return path_cost+self.getCostOfActionsFighter(actions)+self.heuristic_function(state, self.goal[0])
+    #Function that calculates the cost of a given path: the heuristic is kept apart, in the h of the nodes (see AStarFrontier)
+    def path_cost(self, path_cost, state, actions, direction=None)->int:
+        return path_cost+self.getCostOfActionsFighter(actions)
+
+    #Estimate of the cost from state (facing direction, if known) to the goal
+    def h(self, state, direction=None):
+        if self.oriented and direction is not None:
+            return self.heuristic_function(state, self.goal[0], direction)
+        return self.heuristic_function(state, self.goal[0])
         
     def goal_test(self, node):
         return not (super().goal_test(node.state) == False or (node.state in self.wumpus and node.state not in node.killedWumpuses))
@@ -73,6 +114,26 @@ def killWumpuses(node, allWumpuses, widthOfGrid, heightOfGrid):
             killedWumpuses.append(wumpus)
     return killedWumpuses
 
+#Poses of the grid from which a shot hits the wumpus in cell: as in killWumpuses the arrow flies
+#through every cell up to the border of the grid, starting from the cell of the hunter
+def shooting_poses(grid, cell):
+    x, y = int(cell[0]), int(cell[1])
+    if not (0 <= x < grid.width and 0 <= y < grid.height):
+        return []
+    poses = [(x * grid.height + y_from) * 4 for y_from in range(0, y + 1)]                   #facing N
+    poses += [(x_from * grid.height + y) * 4 + 1 for x_from in range(0, x + 1)]              #facing E
+    poses += [(x * grid.height + y_from) * 4 + 2 for y_from in range(y, grid.height)]        #facing S
+    poses += [(x_from * grid.height + y) * 4 + 3 for x_from in range(x, grid.width)]         #facing O
+    return poses
+
+#Bitmask of the wumpuses hit by shooting from every pose, built once per problem
+def line_of_fire(grid, wumpus_bits):
+    fire = [0] * grid.n_poses
+    for cell, bit in wumpus_bits.items():
+        for pose in shooting_poses(grid, cell):
+            fire[pose] |= bit
+    return fire
+
 def moveForward(node):
     direction_map = {
         "N": (0, 1),
@@ -91,19 +152,152 @@ def rotateRight(node):
     return directions[(directions.index(node.direction) + 1) % len(directions)]
 
 
-def take_gold(eater_locations,gold,actions,list_of_blocks,heuristic_function,currentDirection, wumpus, size, killedWumpuses, includeCostAction):
+#Anytime Repairing A* (ARA*) on an A_star_problem. The first search is a weighted A* ordered by g + weight*h, which
+#finds a plan quickly; every following iteration lowers the weight and repairs the previous search instead of starting
+#over: the path costs and the parents are kept and only the states whose cost improved (open, or inconsistent when met
+#again after being closed) are searched again. The path cost g is the cost of the actions only, the heuristic is kept
+#apart. With an admissible heuristic (includeCostAction, so that every action costs at least 1) the cost of the plan
+#is at most bound times the optimal one, and a bound of 1 proves the plan optimal.
+#If a SearchStats is given as stats it collects the expansions of all the iterations.
+class ARAStar:
+    def __init__(self, problem, weight=2.5, decrement=0.5, stats=None):
+        self.problem = problem
+        self.stats = stats
+        self.weight = weight
+        self.decrement = decrement
+        start = problem.initial
+        self.start = self.state_key(start)
+        self.nodes = {self.start: start} # state key -> best node, its path_cost is g
+        self.h = {}
+        self.open = {self.start: self.key(self.start)} # state key -> key of its live heap entry
+        self.heap = [(self.open[self.start], 0, self.start)]
+        self.closed = set()
+        self.inconsistent = set()
+        self.counter = count(1)
+        self.goal = self.start if problem.goal_test(start) else None # key of the best goal reached
+        self.iterations = [] # expanded states of every iteration
+        self.bound = inf
+
+    def state_key(self, node):
+        return node.key
+
+    def heuristic(self, key):
+        h = self.h.get(key)
+        if h is None:
+            h = self.h[key] = self.problem.h(self.nodes[key].state, self.nodes[key].direction)
+        return h
+
+    def key(self, key):
+        return self.nodes[key].path_cost + self.weight * self.heuristic(key)
+
+    def goal_cost(self):
+        return self.nodes[self.goal].path_cost if self.goal is not None else inf
+
+    #Expand the open states until the plan to the goal is within the weight, False if the deadline passed first
+    def improve_path(self, deadline=None):
+        expanded = 0
+        heap, open_states, nodes = self.heap, self.open, self.nodes
+        while heap:
+            priority, _, key = heap[0]
+            if open_states.get(key) != priority:
+                heappop(heap) #stale entry of a state closed or queued again with a smaller key
+                continue
+            if self.goal_cost() <= priority:
+                break
+            if deadline is not None and perf_counter() > deadline:
+                self.iterations.append(expanded)
+                return False
+            heappop(heap)
+            del open_states[key]
+            self.closed.add(key)
+            expanded += 1
+            node = nodes[key]
+            #A node on a live wumpus is a dead end, as in graph_search
+            if node.state in self.problem.wumpus and node.state not in node.killedWumpuses:
+                continue
+            moves = self.problem.actions(node)
+            if self.stats is not None:
+                self.stats.expanded += 1
+                self.stats.generated += len(moves)
+                self.stats.peak_frontier = max(self.stats.peak_frontier, len(open_states))
+                self.stats.peak_explored = max(self.stats.peak_explored, len(self.closed))
+            for move in moves:
+                child = Node(state=self.problem.result(node.state, move['neighbor']), direction=move['direction'],
+                             killedWumpuses=move['killedWumpuses'], parent=node, action=move['action'],
+                             path_cost=node.path_cost + self.problem.getCostOfActionsFighter(move['action']),
+                             pose=move['pose'], key=move['key'])
+                child_key = self.state_key(child)
+                best = nodes.get(child_key)
+                if best is not None and child.path_cost >= best.path_cost:
+                    continue
+                nodes[child_key] = child
+                if self.problem.goal_test(child) and child.path_cost < self.goal_cost():
+                    self.goal = child_key
+                if child_key in self.closed:
+                    self.inconsistent.add(child_key)
+                else:
+                    open_states[child_key] = self.key(child_key)
+                    heappush(heap, (open_states[child_key], next(self.counter), child_key))
+        self.iterations.append(expanded)
+        return True
+
+    def update_bound(self):
+        goal_cost = self.goal_cost()
+        lower = min((self.nodes[key].path_cost + self.heuristic(key) for key in list(self.open) + list(self.inconsistent)),
+                    default=goal_cost)
+        self.bound = min(self.weight, goal_cost / lower) if lower > 0 else 1
+
+    #Run ARA* until the plan is proved optimal or time_budget seconds have passed (the first plan is always completed).
+    #Returns the goal node, whose parents are the plan, or None if no goal can be reached
+    def search(self, time_budget=None):
+        deadline = perf_counter() + time_budget if time_budget is not None else None
+        if self.stats is not None:
+            self.stats.searches += 1
+        self.improve_path()
+        if self.goal is None:
+            return None
+        self.update_bound()
+        while self.bound > 1 and (deadline is None or perf_counter() < deadline):
+            self.weight = max(1, self.weight - self.decrement)
+            #Repair: the inconsistent states are searched again, with the keys of the new weight
+            self.open.update(dict.fromkeys(self.inconsistent))
+            self.inconsistent = set()
+            self.closed = set()
+            for key in self.open:
+                self.open[key] = self.key(key)
+            self.heap = [(priority, next(self.counter), key) for key, priority in self.open.items()]
+            heapify(self.heap)
+            if not self.improve_path(deadline):
+                break #out of time: keep the plan found so far, with the bound of the last full iteration
+            self.update_bound()
+        if self.stats is not None:
+            self.stats.record_solution(self.nodes[self.goal])
+        return self.nodes[self.goal]
+
+
+def take_gold(eater_locations,gold,actions,list_of_blocks,heuristic_function,currentDirection, wumpus, size, killedWumpuses, includeCostAction, stats=None, time_budget=None):
     firstNode=Node(eater_locations, killedWumpuses= killedWumpuses, direction=currentDirection,parent=None, action=None,path_cost=0) 
     problem=A_star_problem(firstNode,[gold],actions,list_of_blocks, heuristic_function, wumpus, size, includeCostAction)
-    solution, counter = graph_search(problem,Priority_Queue([firstNode]))
+    bound = 1 #the exact search is optimal
+    if time_budget is not None:
+        #Anytime search: the first plan comes from a weighted A*, then it is improved until the budget runs out
+        search = ARAStar(problem, stats=stats)
+        solution, counter, bound = search.search(time_budget), sum(search.iterations), search.bound
+    else:
+        solution, counter = graph_search(problem,AStarFrontier([firstNode]),stats)
     if solution == None: 
-        return [None, counter, []]
-    return [solution, counter, solution.killedWumpuses]
+        return [None, counter, [], bound]
+    return [solution, counter, solution.killedWumpuses, bound]
 
  
 #Function that runs the search problem. It is designed to potentially collect more than one gold and to have more than one wumpus
-def A_star_runner(eater_locations,gold_locations,actions,list_of_blocks,heuristic_function, wumpus, size,includeCostAction):
+#If a SearchStats is given as stats it collects the statistics of all the searches
+#With a time_budget in seconds the searches are anytime (ARA*) and share it: each gets the time left over the searches left
+def A_star_runner(eater_locations,gold_locations,actions,list_of_blocks,heuristic_function, wumpus, size,includeCostAction, stats=None, time_budget=None):
     performedActions = []
+    deadline = perf_counter() + time_budget if time_budget is not None else None
     totalCounter = 0
+    worstBound = 1 #suboptimality bound of the anytime searches
 
     #Set the initial position of the fighter to N
     currentDirection = "N"
@@ -113,15 +307,18 @@ def A_star_runner(eater_locations,gold_locations,actions,list_of_blocks,heuristi
     #Instantiate problem until no gold are available
     while len(gold_locations) > 0:
         closestGoldPos=getClosestGold(eater_locations, gold_locations, heuristic_function)
-        solution, counter, killedWumpuses = take_gold(eater_locations, closestGoldPos, actions, list_of_blocks, heuristic_function, currentDirection, wumpus, size, globalKilledWumpuses,includeCostAction)
-        globalKilledWumpuses = killedWumpuses
+        budget = max(0, deadline - perf_counter()) / (len(gold_locations) + 1) if deadline is not None else None
+        solution, counter, killedWumpuses, bound = take_gold(eater_locations, closestGoldPos, actions, list_of_blocks, heuristic_function, currentDirection, wumpus, size, globalKilledWumpuses,includeCostAction,stats,budget)
         #If the current gold cannot be reached, try to reach the next one and do not consider the current gold
+        #(the wumpuses killed so far stay dead: the failed search shot nothing)
         if solution == None: 
             gold_locations.remove(closestGoldPos)
             continue
+        globalKilledWumpuses = killedWumpuses
 
         #Otherwise update the counter of the node visited
         totalCounter += counter
+        worstBound = max(worstBound, bound)
         #Update the actions to reach that gold
         performedActions += solution.solution()
         #Add the grap operation
@@ -133,13 +330,157 @@ def A_star_runner(eater_locations,gold_locations,actions,list_of_blocks,heuristi
 
     #Return to the base
     #Instantiate a new problem for returning to the base
-    solution,counter,shotWumpus = take_gold(eater_locations, (0,0), actions, list_of_blocks, heuristic_function, currentDirection, wumpus, size, globalKilledWumpuses,includeCostAction) 
+    budget = max(0, deadline - perf_counter()) if deadline is not None else None
+    solution,counter,shotWumpus,bound = take_gold(eater_locations, (0,0), actions, list_of_blocks, heuristic_function, currentDirection, wumpus, size, globalKilledWumpuses,includeCostAction,stats,budget) 
     totalCounter += counter
     if solution == None:
         return performedActions
+    worstBound = max(worstBound, bound)
     performedActions += solution.solution()
     performedActions += [actions[5]] #climb action
     print("Number of visited nodes: ",str(totalCounter))
+    if time_budget is not None:
+        print("Suboptimality bound: {:.3f}".format(worstBound))
     return performedActions
 
- 
\ No newline at end of file
+
+#Joint planner collecting all the golds and climbing out in a single A* search. A state packs the pose of the hunter,
+#the bitmask of the killed wumpuses and the bitmask of the collected golds into one integer. Every action costs 1 but
+#the shot, which costs 10 (the costs of the game), so the plan found is the one with the best total reward among those
+#collecting every reachable gold. The heuristic is admissible and consistent: the distance (on the grid without the
+#pits) to the nearest remaining gold or to the exit, plus the minimum spanning tree of the remaining golds and the exit,
+#plus one GRAB per remaining gold and the CLIMB. With weight > 1 the search is a weighted A* whose plan costs at most
+#weight times the optimal one.
+class JointGoldPlanner:
+    def __init__(self, gold_locations, list_of_blocks, wumpus, size, exit=(0, 0)):
+        self.grid = OrientedGrid.compile((int(size[0]), int(size[1])), frozenset((int(x), int(y)) for x, y in list_of_blocks))
+        self.wumpus_bits = {tuple(int(v) for v in cell): 1 << i for i, cell in enumerate(wumpus)}
+        self.fire = line_of_fire(self.grid, self.wumpus_bits)
+        self.free = np.ones((self.grid.width, self.grid.height), dtype=bool)
+        for x, y in list_of_blocks:
+            if 0 <= x < self.grid.width and 0 <= y < self.grid.height:
+                self.free[x, y] = False
+        self.exit = (int(exit[0]), int(exit[1]))
+        self.golds = list(dict.fromkeys(tuple(int(v) for v in gold) for gold in gold_locations))
+        self.gold_bits = {gold: 1 << i for i, gold in enumerate(self.golds)}
+        #Distance fields of the golds and of the exit (last), flattened by cell id
+        self.fields = [distance_field(self.free, cell).ravel() for cell in self.golds + [self.exit]]
+        self.pose_bits = self.grid.n_poses.bit_length()
+        self.kill_bits = len(self.wumpus_bits)
+        self.msts = {}
+
+    def cell_id(self, cell):
+        return cell[0] * self.grid.height + cell[1]
+
+    def pack(self, pose, killed, collected):
+        return (((collected << self.kill_bits) | killed) << self.pose_bits) | pose
+
+    def unpack(self, key):
+        pose = key & ((1 << self.pose_bits) - 1)
+        rest = key >> self.pose_bits
+        return pose, rest & ((1 << self.kill_bits) - 1), rest >> self.kill_bits
+
+    #Cost of the minimum spanning tree (Prim) of the remaining golds and the exit, given by their indexes in fields
+    def mst(self, remaining):
+        cost = self.msts.get(remaining)
+        if cost is None:
+            cells = [i for i in range(len(self.golds)) if remaining >> i & 1] + [len(self.golds)]
+            points = [self.cell_id((self.golds + [self.exit])[i]) for i in cells]
+            best = {i: self.fields[cells[0]][point] for i, point in zip(cells[1:], points[1:])}
+            cost = 0
+            while best:
+                i = min(best, key=best.get)
+                cost += best.pop(i)
+                for j in best:
+                    best[j] = min(best[j], self.fields[i][points[cells.index(j)]])
+            self.msts[remaining] = cost
+        return cost
+
+    def heuristic(self, pose, remaining):
+        cell_id = pose >> 2
+        nearest = min(self.fields[i][cell_id] for i in range(len(self.fields))
+                      if i == len(self.golds) or remaining >> i & 1)
+        return int(nearest) + self.mst(remaining) + bin(remaining).count('1') + 1
+
+    def successors(self, key):
+        pose, killed, collected = self.unpack(key)
+        grid = self.grid
+        cell = grid.cell(pose)
+        forward = grid.forward[pose]
+        if forward >= 0:
+            bit = self.wumpus_bits.get(grid.cell(forward), 0)
+            if not bit or killed & bit: #never walk into a live wumpus
+                yield 0, self.pack(forward, killed, collected), 1
+        yield 2, self.pack(grid.left[pose], killed, collected), 1
+        yield 1, self.pack(grid.right[pose], killed, collected), 1
+        if not killed and self.fire[pose]:
+            yield 3, self.pack(pose, self.fire[pose], collected), 10
+        bit = self.gold_bits.get(cell, 0)
+        if bit and not collected & bit:
+            yield 4, self.pack(pose, killed, collected | bit), 1
+
+    #A* from the start to the exit with all the reachable golds collected. Returns the list of action indexes
+    #(CLIMB included) and the number of expanded states; the list is None if there is no such plan
+    def search(self, start, direction="N", weight=1.0, stats=None):
+        start_pose = self.grid.pose(start, direction)
+        start_id = self.cell_id(start)
+        if self.fields[-1][start_id] < 0:
+            return None, 0
+        all_golds = 0
+        for i in range(len(self.golds)):
+            if self.fields[i][start_id] >= 0: #the golds separated by pits are left behind
+                all_golds |= 1 << i
+        target = self.cell_id(self.exit)
+        start_key = self.pack(start_pose, 0, 0)
+        g, parents = {start_key: 0}, {start_key: None}
+        counter = count()
+        heap = [(weight * self.heuristic(start_pose, all_golds), 0, next(counter), start_key)]
+        closed = set()
+        expanded = generated = 0
+        plan = None
+        while heap:
+            _, _, _, key = heappop(heap)
+            if key in closed:
+                continue
+            closed.add(key)
+            pose, killed, collected = self.unpack(key)
+            if pose >> 2 == target and collected == all_golds:
+                cost, plan = g[key] + 1, [5]
+                while parents[key] is not None:
+                    key, action = parents[key]
+                    plan.append(action)
+                plan.reverse()
+                break
+            expanded += 1
+            for action, child, step in self.successors(key):
+                generated += 1
+                if child in closed:
+                    continue
+                child_g = g[key] + step
+                if child_g < g.get(child, inf):
+                    g[child] = child_g
+                    parents[child] = (key, action)
+                    child_pose, _, child_collected = self.unpack(child)
+                    h = self.heuristic(child_pose, all_golds & ~child_collected)
+                    heappush(heap, (child_g + weight * h, -child_g, next(counter), child))
+        if stats is not None:
+            stats.searches += 1
+            stats.expanded += expanded
+            stats.generated += generated
+            stats.peak_explored = max(stats.peak_explored, len(closed))
+            if plan is not None:
+                stats.solved += 1
+                stats.solution_cost += cost
+                stats.solution_length += len(plan)
+        return plan, expanded
+
+
+#Plan the whole episode (every grab and the climb) with a JointGoldPlanner. If no plan collects all the reachable
+#golds (e.g. two wumpuses block them and there is one arrow) it falls back to A_star_runner, one gold at a time
+def joint_gold_runner(eater_locations,gold_locations,actions,list_of_blocks, wumpus, size, weight=1.0, stats=None):
+    planner = JointGoldPlanner(gold_locations, list_of_blocks, wumpus, size)
+    plan, counter = planner.search(eater_locations, "N", weight, stats)
+    print("Number of visited nodes: ",str(counter))
+    if plan is None:
+        return A_star_runner(eater_locations, list(gold_locations), actions, list_of_blocks, manhattan_distance, wumpus, size, True, stats)
+    return [actions[i] for i in plan]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of the heuristics of A_star_runner on random classic Wumpus worlds.
+
+Run with `python benchmark.py [worlds] [size]` to compare the nodes expanded and the cost of the plans with the
+Manhattan distance, with the Manhattan distance plus the minimum number of turns (OrientedHeuristic) and with the
+oriented distance tables (OrientedDistanceTable). A size of 0 picks a random size from 4 to 8 for every world.
+The golds are still collected one at a time, the closest first, so a better heuristic can change the order of the
+golds and the total cost of the plan, even though every single search is optimal.
+"""
+
+import contextlib
+import io
+import random
+import sys
+
+import wumpus as wws
+
+from A_star_problem import A_star_runner
+from search_algorithms import SearchStats
+from utility_functions import manhattan_distance, OrientedHeuristic, OrientedDistanceTable
+
+# Name -> heuristic of a world from its size and pits
+HEURISTICS = {
+    'manhattan': lambda size, pits: manhattan_distance,
+    'manhattan+turns': lambda size, pits: OrientedHeuristic(),
+    'oriented table': OrientedDistanceTable,
+}
+
+
+def world_problem(world):
+    """Return the hunter location, the gold locations, the actions, the pits, the wumpuses and the size of a world"""
+    golds, pits, wumpuses = [], [], []
+    for obj in world.objects:
+        location = (obj.location.x, obj.location.y)
+        if isinstance(obj, wws.Hunter):
+            hunter = location
+            actions = list(obj.Actions)
+        elif isinstance(obj, wws.Pit):
+            pits.append(location)
+        elif isinstance(obj, wws.Wumpus):
+            wumpuses.append(location)
+        elif isinstance(obj, wws.Gold):
+            golds.append(location)
+    return hunter, golds, actions, pits, wumpuses, (world.size.x, world.size.y)
+
+
+def plan_cost(plan, actions):
+    """Cost of a plan with the costs of the game: 10 for the shot, 1 for every other action"""
+    return sum(10 if action == actions[3] else 1 for action in plan)
+
+
+def compare_heuristics(worlds=50, size=0):
+    """Expanded nodes and plan cost of A_star_runner (with the cost of the actions) for every heuristic"""
+    totals = {name: [0, 0] for name in HEURISTICS}
+    print('{:>5} {:>5}'.format('seed', 'size') + ''.join(' {:>16}'.format(name) for name in HEURISTICS))
+    for seed in range(worlds):
+        random.seed(seed)
+        world = wws.WumpusWorld.classic(size=size if size > 3 else random.randint(4, 8))
+        hunter, golds, actions, pits, wumpuses, world_size = world_problem(world)
+        row = []
+        for name, make in HEURISTICS.items():
+            stats = SearchStats()
+            with contextlib.redirect_stdout(io.StringIO()):
+                plan = A_star_runner(hunter, list(golds), actions, pits, make(world_size, pits), wumpuses, world_size, True, stats)
+            totals[name][0] += stats.expanded
+            cost = plan_cost(plan, actions)
+            totals[name][1] += cost
+            row.append('{}/{}'.format(stats.expanded, cost))
+        print('{:>5} {:>5}'.format(seed, world_size[0]) + ''.join(' {:>16}'.format(cell) for cell in row))
+    print('expanded nodes / plan cost in total:')
+    base = totals['manhattan'][0]
+    for name, (expanded, length) in totals.items():
+        print('  {:<16} {:>8} {:>8}  ({:.1%} of manhattan)'.format(name, expanded, length, expanded / base if base else 1))
+
+
+def main(*args):
+    compare_heuristics(int(args[0]) if args else 50, int(args[1]) if len(args) > 1 else 0)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
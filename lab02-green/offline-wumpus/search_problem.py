@@ -1,5 +1,10 @@
+from functools import lru_cache
 import numpy as np
 
+# Directions of the hunter in clockwise order: turning right is +1, turning left is -1
+DIRECTIONS = ("N", "E", "S", "O")
+DIRECTION_MOVES = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
 def is_in(elt, seq):  # Utility function
     """Similar to (elt in seq), but compares with 'is', not '=='."""
     return any(x is elt for x in seq)
@@ -28,6 +33,9 @@ class Problem:
 
     def path_cost(self, path_cost,state)->int:
         return 1
+
+    def h(self, state, direction=None): # Estimate of the cost from state to the goal, none for uninformed searches
+        return 0
     
     #Check if the neighbor generated is valid. That is, if it is in the matrix and if it is not in the position of a pit
     def is_valid(self,new_pos): 
@@ -35,17 +43,81 @@ class Problem:
         new_pos[0]<self.size[0] and new_pos[0]>=0 
         and new_pos[1]>=0 and new_pos[1]<self.size[1])
 
+class OrientedGrid:
+    """
+    The oriented state space of the hunter compiled to integers. A pose is cell id * 4 + direction
+    index (cell id = x*height + y) and the key of a search state packs the pose with the bitmask of
+    the killed wumpuses: key = mask * n_poses + pose. Moving forward and turning are lookups in
+    tables indexed by pose (-1 when moving forward leaves the grid or enters a block).
+    """
+    def __init__(self, size, list_of_blocks):
+        self.width, self.height = int(size[0]), int(size[1])
+        self.n_poses = self.width * self.height * 4
+        blocks = set((int(x), int(y)) for x, y in list_of_blocks)
+        self.cells = [(x, y) for x in range(self.width) for y in range(self.height)]
+        forward = []
+        for x, y in self.cells:
+            for dx, dy in DIRECTION_MOVES:
+                nx, ny = x + dx, y + dy
+                valid = 0 <= nx < self.width and 0 <= ny < self.height and (nx, ny) not in blocks
+                forward.append(((nx * self.height + ny) * 4 + len(forward) % 4) if valid else -1)
+        self.forward = forward
+        self.left = [pose - pose % 4 + (pose - 1) % 4 for pose in range(self.n_poses)]
+        self.right = [pose - pose % 4 + (pose + 1) % 4 for pose in range(self.n_poses)]
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def compile(size, blocks):
+        """The grid of the given size and frozenset of blocks, built once and shared by the problems"""
+        return OrientedGrid(size, blocks)
+
+    def pose(self, state, direction):
+        return (int(state[0]) * self.height + int(state[1])) * 4 + DIRECTIONS.index(direction)
+
+    def cell(self, pose):
+        return self.cells[pose >> 2]
+
+
+class ExploredSet:
+    """Set of packed state keys stored as bit arrays, one page of n_poses bits per killed-wumpus mask"""
+    def __init__(self, n_poses):
+        self.n_poses = n_poses
+        self.pages = {}
+        self.size = 0
+
+    def add(self, key):
+        mask, pose = divmod(key, self.n_poses)
+        page = self.pages.get(mask)
+        if page is None:
+            page = self.pages[mask] = bytearray((self.n_poses + 7) >> 3)
+        bit = 1 << (pose & 7)
+        if not page[pose >> 3] & bit:
+            page[pose >> 3] |= bit
+            self.size += 1
+
+    def __contains__(self, key):
+        mask, pose = divmod(key, self.n_poses)
+        page = self.pages.get(mask)
+        return page is not None and page[pose >> 3] >> (pose & 7) & 1 == 1
+
+    def __len__(self):
+        return self.size
+
+
 class Node:
     """
     A node in the search tree
     """
-    def __init__(self, state, direction, killedWumpuses, parent=None, action=None, path_cost=0 ):
+    def __init__(self, state, direction, killedWumpuses, parent=None, action=None, path_cost=0, pose=None, key=None, h=0):
         self.state = state
         self.direction=direction
         self.parent = parent
         self.action = action # action from parent to this node
         self.path_cost = path_cost
         self.killedWumpuses = killedWumpuses
+        self.pose = pose # packed (state, direction) and search state key, see OrientedGrid
+        self.key = key
+        self.h = h # estimate of the cost from this node to the goal, kept apart from path_cost
 
     def __repr__(self):
         return '(state:'+str(self.state)+" direction: "+str(self.direction)+" action: "+str(self.action)+' Path_cost: '+str(self.path_cost)+" - Killed Wumpuses: "+str(self.killedWumpuses)
@@ -64,7 +136,10 @@ class Node:
                          killedWumpuses=action['killedWumpuses'],
                          parent=self, 
                          action=action['action'], 
-                         path_cost=problem.path_cost(self.path_cost,next_state, action['action'])
+                         path_cost=problem.path_cost(self.path_cost,next_state, action['action'], action['direction']),
+                         pose=action.get('pose'),
+                         key=action.get('key'),
+                         h=problem.h(next_state, action['direction'])
                         )
 
         return next_node
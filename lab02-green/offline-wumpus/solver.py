@@ -8,8 +8,8 @@ import sys
 from typing import Iterable
 
 import wumpus as wws
-from A_star_problem import A_star_runner
-from utility_functions import manhattan_distance, euclidean_distance
+from A_star_problem import A_star_runner, joint_gold_runner
+from utility_functions import manhattan_distance, euclidean_distance, DistanceHeuristic, LandmarkHeuristic
 
 
 class GeneralSearchPlayer(wws.OfflinePlayer):
@@ -53,6 +53,18 @@ class AStarManhattanActionOptPlayer(GeneralSearchPlayer):
         return A_star_runner(eater_location, gold_locations, all_actions, block_locations,manhattan_distance, wumpus, size, True)
 
 
+class AStarDistancePlayer(GeneralSearchPlayer):
+    def search(self, eater_location, gold_locations, all_actions, block_locations, wumpus, size):
+        return A_star_runner(eater_location, gold_locations, all_actions, block_locations,DistanceHeuristic(size, block_locations), wumpus, size, False)
+
+class AStarLandmarkPlayer(GeneralSearchPlayer):
+    def search(self, eater_location, gold_locations, all_actions, block_locations, wumpus, size):
+        return A_star_runner(eater_location, gold_locations, all_actions, block_locations,LandmarkHeuristic.cached(size, block_locations), wumpus, size, False)
+
+class JointGoldPlayer(GeneralSearchPlayer):
+    def search(self, eater_location, gold_locations, all_actions, block_locations, wumpus, size):
+        return joint_gold_runner(eater_location, gold_locations, all_actions, block_locations, wumpus, size)
+
 class AStarEuclideanPlayer(GeneralSearchPlayer):
     def search(self, eater_location, gold_locations, all_actions, block_locations, wumpus, size):
         return A_star_runner(eater_location, gold_locations, all_actions, block_locations,euclidean_distance, wumpus, size, False)
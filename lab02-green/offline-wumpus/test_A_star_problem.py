@@ -0,0 +1,98 @@
+import enum
+
+from A_star_problem import take_gold, A_star_runner, A_star_problem
+from search_algorithms import SearchStats, Priority_Queue, tree_search
+from search_problem import Node
+from utility_functions import manhattan_distance
+
+
+class Actions(enum.Enum):
+    MOVE = 0
+    RIGHT = 1
+    LEFT = 2
+    SHOOT = 3
+    GRAB = 4
+    CLIMB = 5
+
+
+#The only way to the gold at (0,2) is through the wumpus at (0,1): the pits close the way around it
+PITS = [(1, 0), (1, 1)]
+WUMPUS = [(0, 1)]
+SIZE = (3, 3)
+
+
+def walk(actions, cell=(0, 0), direction="N"):
+    moves = {"N": (0, 1), "E": (1, 0), "S": (0, -1), "O": (-1, 0)}
+    directions = ["N", "E", "S", "O"]
+    cells = [cell]
+    for action in actions:
+        if action == Actions.MOVE:
+            cell = (cell[0] + moves[direction][0], cell[1] + moves[direction][1])
+            cells.append(cell)
+        elif action == Actions.RIGHT:
+            direction = directions[(directions.index(direction) + 1) % 4]
+        elif action == Actions.LEFT:
+            direction = directions[(directions.index(direction) - 1) % 4]
+    return cells
+
+
+def plan(time_budget):
+    solution, _, killed, _ = take_gold((0, 0), (0, 2), list(Actions), PITS, manhattan_distance, "N", WUMPUS, SIZE, [], True,
+                                    time_budget=time_budget)
+    return solution.solution(), killed
+
+
+def test_ara_star_does_not_walk_through_a_live_wumpus():
+    actions, killed = plan(5.0)
+    assert Actions.SHOOT in actions
+    assert killed == WUMPUS
+    assert actions.index(Actions.SHOOT) < actions.index(Actions.MOVE)
+
+
+def test_ara_star_matches_the_exact_search():
+    exact, _ = plan(None)
+    anytime, _ = plan(5.0)
+    assert len(anytime) == len(exact)
+    assert walk(anytime)[-1] == walk(exact)[-1] == (0, 2)
+
+
+def test_ara_star_records_its_statistics():
+    stats = SearchStats()
+    actions = A_star_runner((0, 0), [(0, 2)], list(Actions), PITS, manhattan_distance, WUMPUS, SIZE, True, stats, time_budget=5.0)
+    assert actions[-1] == Actions.CLIMB
+    assert stats.searches == stats.solved == 2
+    assert stats.expanded > 0 and stats.generated > 0
+
+
+def test_tree_search_tests_the_goal_on_nodes():
+    first = Node((0, 0), killedWumpuses=[], direction="N")
+    problem = A_star_problem(first, [(2, 2)], list(Actions), [(1, 1)], manhattan_distance, [], SIZE, True)
+    goal = tree_search(problem, Priority_Queue([first]))
+    assert goal.state == (2, 2)
+    assert walk(goal.solution())[-1] == (2, 2)
+
+
+def test_the_frontier_keeps_the_nodes_that_killed_a_wumpus():
+    #Both golds are only reached shooting the wumpus at (1,0): the frontier must not merge that node with one that did not
+    actions = A_star_runner((0, 0), [(0, 1), (2, 1)], list(Actions), [(1, 1), (1, 2)], manhattan_distance, [(1, 0), (0, 2)],
+                            SIZE, True)
+    assert actions.count(Actions.GRAB) == 2
+    assert len(actions) == 19
+    assert actions[-1] == Actions.CLIMB
+
+
+def test_a_star_finds_the_cheapest_plan():
+    #Walking around the wumpus at (0,1) costs 7, shooting it and walking straight costs 12
+    solution = take_gold((0, 0), (0, 2), list(Actions), [(3, 1), (2, 1), (2, 3)], manhattan_distance, "N", [(0, 1), (2, 2)],
+                         (4, 4), [], True)[0]
+    assert solution.path_cost == 7
+    assert Actions.SHOOT not in solution.solution()
+
+
+def test_an_unreachable_gold_does_not_give_back_the_arrow():
+    #The gold at (2,1) cannot be reached after shooting the wumpus at (0,1)
+    actions = A_star_runner((0, 0), [(2, 1), (0, 2), (3, 1)], list(Actions), [(1, 1), (1, 0), (3, 3)], manhattan_distance,
+                            [(0, 1), (2, 2)], (4, 4), True)
+    assert actions.count(Actions.SHOOT) == 1
+    assert actions.count(Actions.GRAB) == 1
+    assert actions[-1] == Actions.CLIMB
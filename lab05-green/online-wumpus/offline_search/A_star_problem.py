@@ -1,5 +1,5 @@
 import numpy as np
-from .search_problem import Problem
+from .search_problem import Problem, OrientedGrid, DIRECTIONS
 from .search_algorithms import *
 from .utility_functions import getClosestGold
 from .utility_functions import manhattan_distance
@@ -8,35 +8,68 @@ from .utility_functions import manhattan_distance
 class A_star_problem(Problem):
     def __init__(self,initial, goal, actions, list_of_blocks, heuristic_function, wumpus, size, includeCostAction):
         self.heuristic_function=heuristic_function
+        #Orientation-aware heuristics (see OrientedHeuristic) also get the direction of the hunter
+        self.oriented = getattr(heuristic_function, 'oriented', False)
         self.wumpus = wumpus
         self.includeCostAction=includeCostAction
         super().__init__(initial,goal, actions, list_of_blocks, size)
+        #The oriented states are packed into integers, see OrientedGrid
+        self.grid = OrientedGrid.compile((int(size[0]), int(size[1])), frozenset((int(x), int(y)) for x, y in list_of_blocks))
+        self.wumpus_bits = {tuple(int(v) for v in cell): 1 << i for i, cell in enumerate(wumpus)}
+        self.wumpus_masks = [self.wumpus_bits[tuple(int(v) for v in cell)] for cell in wumpus]
+        #Line of fire index: fire[pose] is the bitmask of the wumpuses hit by shooting from that pose
+        self.fire = line_of_fire(self.grid, self.wumpus_bits)
+        initial.pose = self.grid.pose(initial.state, initial.direction)
+        initial.key = self.key(initial.pose, initial.killedWumpuses)
+        initial.h = self.h(initial.state, initial.direction)
+
+    #Cells and directions from which a shot hits the given wumpus
+    def shooters(self, wumpus):
+        return [(self.grid.cell(pose), DIRECTIONS[pose & 3]) for pose in shooting_poses(self.grid, wumpus)]
+
+    #Packed search state key of a pose and a list of killed wumpuses
+    def key(self, pose, killedWumpuses):
+        mask = 0
+        for cell in killedWumpuses:
+            mask |= self.wumpus_bits.get((int(cell[0]), int(cell[1])), 0)
+        return mask * self.grid.n_poses + pose
 
     #Given a node calculate its expansion returning the available_neighbors 
     def actions(self, node):
-        available_neighbors=[] 
-        if self.is_valid(moveForward(node)):     
+        grid, pose = self.grid, node.pose
+        killed = node.key - pose #the mask part of the key, the same for all the moves but the shot
+        available_neighbors=[]
+        forward = grid.forward[pose]
+        if forward >= 0:
             #If given this position is possible to move forward wrt to the current direction add the move action     
-            available_neighbors.append({'neighbor':moveForward(node),
+            available_neighbors.append({'neighbor':grid.cell(forward),
                                         'action':[self.available_actions["MOVE"]], 
                                         'direction':node.direction, 
-                                        'killedWumpuses': node.killedWumpuses})
+                                        'killedWumpuses': node.killedWumpuses,
+                                        'pose': forward, 'key': forward + killed})
         #Add left rotation
+        left = grid.left[pose]
         available_neighbors.append({'neighbor':node.state,
                                     'action':[self.available_actions["LEFT"]],
-                                    'direction':rotateLeft(node), 
-                                    'killedWumpuses': node.killedWumpuses})
+                                    'direction':DIRECTIONS[left & 3], 
+                                    'killedWumpuses': node.killedWumpuses,
+                                    'pose': left, 'key': left + killed})
         #Add right rotation
+        right = grid.right[pose]
         available_neighbors.append({'neighbor':node.state,
                                     'action':[self.available_actions["RIGHT"]], 
-                                    'direction':rotateRight(node), 
-                                    'killedWumpuses': node.killedWumpuses})
-        #If there is a wumpus in the neighboring cells shoot it
-        if node.killedWumpuses == []:
+                                    'direction':DIRECTIONS[right & 3], 
+                                    'killedWumpuses': node.killedWumpuses,
+                                    'pose': right, 'key': right + killed})
+        #If there is a wumpus in the line of fire shoot it (a shot hitting nothing would only lead back to this state)
+        hit = self.fire[pose]
+        if hit and node.killedWumpuses == []:
+            killedWumpuses = [cell for cell, bit in zip(self.wumpus, self.wumpus_masks) if hit & bit]
             available_neighbors.append({'neighbor':node.state,
                                         'action':[self.available_actions["SHOOT"]], 
                                         'direction':node.direction, 
-                                        'killedWumpuses': killWumpuses(node, self.wumpus, self.size[0], self.size[1])})
+                                        'killedWumpuses': killedWumpuses,
+                                        'pose': pose, 'key': hit * grid.n_poses + pose})
         return available_neighbors
         
 
@@ -49,10 +82,15 @@ class A_star_problem(Problem):
             return (len(actions)-1)+10 if 3 in actions_value else len(actions)
         return 10 if 3 in actions_value else 0
     
-    #Function that calculates the cost of a given path
-    def path_cost(self, path_cost, state, actions)->int:
-        # Adds the cost of the path so far with the cost of the heuristic_function which estimates the cost from that node to the goal
-        return path_cost+self.getCostOfActionsFighter(actions)+self.heuristic_function(state, self.goal[0])
+    #Function that calculates the cost of a given path: the heuristic is kept apart, in the h of the nodes (see AStarFrontier)
+    def path_cost(self, path_cost, state, actions, direction=None)->int:
+        return path_cost+self.getCostOfActionsFighter(actions)
+
+    #Estimate of the cost from state (facing direction, if known) to the goal
+    def h(self, state, direction=None):
+        if self.oriented and direction is not None:
+            return self.heuristic_function(state, self.goal[0], direction)
+        return self.heuristic_function(state, self.goal[0])
         
     def goal_test(self, node):
         return not (super().goal_test(node.state) == False or (node.state in self.wumpus and node.state not in node.killedWumpuses))
@@ -74,6 +112,26 @@ def killWumpuses(node, allWumpuses, widthOfGrid, heightOfGrid):
             killedWumpuses.append(wumpus)
     return killedWumpuses
 
+#Poses of the grid from which a shot hits the wumpus in cell: as in killWumpuses the arrow flies
+#through every cell up to the border of the grid, starting from the cell of the hunter
+def shooting_poses(grid, cell):
+    x, y = int(cell[0]), int(cell[1])
+    if not (0 <= x < grid.width and 0 <= y < grid.height):
+        return []
+    poses = [(x * grid.height + y_from) * 4 for y_from in range(0, y + 1)]                   #facing N
+    poses += [(x_from * grid.height + y) * 4 + 1 for x_from in range(0, x + 1)]              #facing E
+    poses += [(x * grid.height + y_from) * 4 + 2 for y_from in range(y, grid.height)]        #facing S
+    poses += [(x_from * grid.height + y) * 4 + 3 for x_from in range(x, grid.width)]         #facing O
+    return poses
+
+#Bitmask of the wumpuses hit by shooting from every pose, built once per problem
+def line_of_fire(grid, wumpus_bits):
+    fire = [0] * grid.n_poses
+    for cell, bit in wumpus_bits.items():
+        for pose in shooting_poses(grid, cell):
+            fire[pose] |= bit
+    return fire
+
 def moveForward(node):
     direction_map = {
         "N": (0, 1),
@@ -92,10 +150,10 @@ def rotateRight(node):
     return directions[(directions.index(node.direction) + 1) % len(directions)]
 
 
-def take_gold(eater_locations,gold,actions,list_of_blocks,heuristic_function,currentDirection, wumpus, size, killedWumpuses, includeCostAction):
+def take_gold(eater_locations,gold,actions,list_of_blocks,heuristic_function,currentDirection, wumpus, size, killedWumpuses, includeCostAction, stats=None, cancel=None):
     firstNode=Node(eater_locations, killedWumpuses= killedWumpuses, direction=currentDirection,parent=None, action=None,path_cost=0) 
     problem=A_star_problem(firstNode,[gold],actions,list_of_blocks, heuristic_function, wumpus, size, includeCostAction)
-    solution, counter = graph_search(problem,Priority_Queue([firstNode]))
+    solution, counter = graph_search(problem,AStarFrontier([firstNode]),stats,cancel)
      
     if solution == None: 
         return [None, counter, []]
@@ -103,7 +161,8 @@ def take_gold(eater_locations,gold,actions,list_of_blocks,heuristic_function,cur
 
  
 #Function that runs the search problem. It is designed to potentially collect more than one gold and to have more than one wumpus
-def A_star_runner(eater_locations,gold_locations,actions,list_of_blocks,heuristic_function, wumpus, size,includeCostAction):
+#If a SearchStats is given as stats it collects the statistics of all the searches
+def A_star_runner(eater_locations,gold_locations,actions,list_of_blocks,heuristic_function, wumpus, size,includeCostAction, stats=None):
     performedActions = []
     totalCounter = 0
 
@@ -115,12 +174,13 @@ def A_star_runner(eater_locations,gold_locations,actions,list_of_blocks,heuristi
     #Instantiate problem until no gold are available
     while len(gold_locations) > 0:
         closestGoldPos=getClosestGold(eater_locations, gold_locations, heuristic_function)
-        solution, counter, killedWumpuses = take_gold(eater_locations, closestGoldPos, actions, list_of_blocks, heuristic_function, currentDirection, wumpus, size, globalKilledWumpuses,includeCostAction)
-        globalKilledWumpuses = killedWumpuses
+        solution, counter, killedWumpuses = take_gold(eater_locations, closestGoldPos, actions, list_of_blocks, heuristic_function, currentDirection, wumpus, size, globalKilledWumpuses,includeCostAction,stats)
         #If the current gold cannot be reached, try to reach the next one and do not consider the current gold
+        #(the wumpuses killed so far stay dead: the failed search shot nothing)
         if solution == None: 
             gold_locations.remove(closestGoldPos)
             continue
+        globalKilledWumpuses = killedWumpuses
 
         #Otherwise update the counter of the node visited
         totalCounter += counter
@@ -135,7 +195,7 @@ def A_star_runner(eater_locations,gold_locations,actions,list_of_blocks,heuristi
 
     #Return to the base
     #Instantiate a new problem for returning to the base
-    solution,counter,shotWumpus = take_gold(eater_locations, (0,0), actions, list_of_blocks, heuristic_function, currentDirection, wumpus, size, globalKilledWumpuses,includeCostAction) 
+    solution,counter,shotWumpus = take_gold(eater_locations, (0,0), actions, list_of_blocks, heuristic_function, currentDirection, wumpus, size, globalKilledWumpuses,includeCostAction,stats) 
     totalCounter += counter
     if solution == None:
         return performedActions
@@ -143,10 +203,12 @@ def A_star_runner(eater_locations,gold_locations,actions,list_of_blocks,heuristi
     performedActions += [actions[5]] #climb action 
     return performedActions
 
-def offline_search(current_position, current_direction,goal_location,visited_cells, actions, size):
+#A DistanceHeuristic of the visited cells can be passed as heuristic_function to follow the known corridors
+#With max_expansions the search is stopped after that many nodes and returns the best plan found so far (possibly none)
+def offline_search(current_position, current_direction,goal_location,visited_cells, actions, size, stats=None, heuristic_function=manhattan_distance, max_expansions=None):
     list_of_blocks=[(i,j) for i in range(size[0]) for j in range(size[0]) if (i,j) not in visited_cells] 
-     
-    solution,counter,shotWumpus = take_gold(current_position, goal_location, actions, list_of_blocks, manhattan_distance, current_direction, [], size, [],True) 
+    cancel = SearchCancel(max_expansions) if max_expansions is not None else None
+    solution,counter,shotWumpus = take_gold(current_position, goal_location, actions, list_of_blocks, heuristic_function, current_direction, [], size, [],True,stats,cancel) 
     if solution == None:
         return []
     return solution.solution()
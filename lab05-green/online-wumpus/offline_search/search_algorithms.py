@@ -1,5 +1,40 @@
+from collections import namedtuple
+from heapq import heappush, heappop
+from itertools import count
+from time import perf_counter
 from .search_problem import *
 
+# Kinds of the events yielded by search_events and tree_search_events
+EXPANDED = 'expanded'   # a node was selected from the frontier and expanded
+INCUMBENT = 'incumbent' # a goal node cheaper than the previous ones was generated, it is the best plan so far
+SOLUTION = 'solution'   # a goal node was selected: the search is over and node is its result
+EXHAUSTED = 'exhausted' # the frontier is empty: there is no solution
+CANCELLED = 'cancelled' # the search was stopped by its SearchCancel, node is the incumbent (or None)
+
+SearchEvent = namedtuple('SearchEvent', 'kind node expanded frontier_size')
+
+
+class SearchCancel:
+    """
+    Cooperative cancellation of a streaming search: the search checks it before selecting every node
+    and stops with a CANCELLED event once cancel() was called, max_expansions nodes were selected or
+    the deadline (a time.perf_counter() value) passed. A consumer can also simply stop iterating.
+    """
+    def __init__(self, max_expansions=None, deadline=None):
+        self.max_expansions = max_expansions
+        self.deadline = deadline
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def should_stop(self, expanded):
+        if self.max_expansions is not None and expanded >= self.max_expansions:
+            self.cancelled = True
+        elif self.deadline is not None and perf_counter() >= self.deadline:
+            self.cancelled = True
+        return self.cancelled
+
 
 class Frontier:
     """The generic interface of a frontier for a search algorithm."""
@@ -21,69 +56,239 @@ class Frontier:
     def add(self, element):
         raise NotImplementedError
 
+    def decrease_key(self, node):
+        """Replace the queued node with the same state if node is cheaper"""
+        raise NotImplementedError
+
 class Priority_Queue(Frontier):
-    """Implements the frontier as a priority queue ordered by path_cost"""
+    """Implements the frontier as a binary heap ordered by path_cost.
+    An index from states to their live heap entries gives O(1) membership, and
+    decrease_key replaces queued nodes by lazy deletion of the stale entries."""
     def __init__(self, elements):
-        self.stack = elements
+        self.heap = []
+        self.entries = {}
+        self.size = 0
+        self.counter = count()
+        self.add_all(elements)
+
+    def key(self, node):
+        return node.key # packed (state, direction, killed wumpuses), the same identity as the explored set
+
+    def priority(self, node):
+        return node.path_cost
 
     def select_and_remove(self):
-        return self.stack.pop()
-    
-    def order_frontier(self):
-        self.stack = sorted(self.stack, key=lambda x: x.path_cost, reverse=True)
+        while self.heap:
+            entry = heappop(self.heap)
+            node = entry[-1]
+            if node is None: # stale entry left by decrease_key
+                continue
+            key = self.key(node)
+            live = self.entries[key]
+            live.remove(entry)
+            if not live:
+                del self.entries[key]
+            self.size -= 1
+            return node
+        raise IndexError('select from an empty frontier')
 
     def contains(self, node):
-        return node in self.stack
-        #return is_in(node, self.stack)
+        return self.key(node) in self.entries
 
     def is_empty(self):
-        return self.stack == []
+        return self.size == 0
 
     def add_all(self, elements):
-        self.stack += elements
-        self.order_frontier()
+        for element in elements:
+            self.add(element)
 
     def add(self, element):
-        self.stack.append(element)
-        self.order_frontier()
+        # ties are broken in LIFO order, as the old sorted list did
+        entry = [self.priority(element), -next(self.counter), element]
+        self.entries.setdefault(self.key(element), []).append(entry)
+        self.size += 1
+        heappush(self.heap, entry)
+
+    def decrease_key(self, node):
+        live = self.entries.get(self.key(node))
+        if live is None or self.priority(node) >= min(entry[0] for entry in live):
+            return
+        for entry in live:
+            entry[-1] = None
+        self.size -= len(live)
+        live.clear()
+        self.add(node)
+
+    def __len__(self):
+        return self.size
 
     def __repr__(self):
-        return str(self.stack)
-    
-def tree_search(problem, frontier):
+        return str(sorted((entry[-1] for live in self.entries.values() for entry in live), key=self.priority))
+
+class AStarFrontier(Priority_Queue):
+    """Priority queue ordered by f = g + h, breaking ties in favour of the larger g
+    (the node closer to the goal according to the heuristic)"""
+    def priority(self, node):
+        return (node.path_cost + node.h, -node.path_cost)
+
+def tree_search_events(problem, frontier, cancel=None):
     """
-    Generic search algorithm, without loops detection. Frontier must already be initialized to problem.initial (the initial node)
+    Streaming tree search: yields a SearchEvent for every expanded node and for every improved
+    incumbent (a generated goal node cheaper than the previous ones), and ends with a SOLUTION,
+    EXHAUSTED or CANCELLED event. Frontier must already be initialized to problem.initial (the initial node)
     """
+    counter = 0
+    incumbent = None
     while not frontier.is_empty():
+        if cancel is not None and cancel.should_stop(counter):
+            yield SearchEvent(CANCELLED, incumbent, counter, len(frontier))
+            return
         node = frontier.select_and_remove()
-        if problem.goal_test(node.state):
-            return node
-        frontier.add_all(node.expand(problem))
-    return None
+        counter += 1
+        if problem.goal_test(node):
+            yield SearchEvent(SOLUTION, node, counter, len(frontier))
+            return
+        children = node.expand(problem)
+        frontier.add_all(children)
+        improved = None
+        for n in children:
+            if problem.goal_test(n) and (incumbent is None or n.path_cost < incumbent.path_cost):
+                incumbent = improved = n
+        if improved is not None:
+            yield SearchEvent(INCUMBENT, improved, counter, len(frontier))
+        yield SearchEvent(EXPANDED, node, counter, len(frontier))
+    yield SearchEvent(EXHAUSTED, None, counter, 0)
+
+def tree_search(problem, frontier, cancel=None):
+    """
+    Generic search algorithm, without loops detection. Frontier must already be initialized to problem.initial (the initial node)
+    """
+    for event in tree_search_events(problem, frontier, cancel):
+        pass
+    return event.node if event.kind == SOLUTION else None
 
 
-def graph_search(problem, frontier):
+class SearchStats:
     """
-    A generic search algorithm, with loop detection. Frontier must already be initialized to problem.initial (the initial node)
+    Counts and timings of graph searches, filled in by graph_search when passed as its stats.
+    Passing the same object to several searches (e.g. one per food) or adding them with +=
+    aggregates them: counts, times and solution costs and lengths are summed, while the peak
+    sizes keep the maximum. Times are in seconds; the frontier time includes the duplicate checks.
+    """
+    COUNTS = ('searches', 'solved', 'expanded', 'generated', 'duplicates', 'solution_cost', 'solution_length')
+    PEAKS = ('peak_frontier', 'peak_explored')
+    TIMES = ('expansion_time', 'frontier_time', 'goal_test_time')
+
+    def __init__(self):
+        for field in self.COUNTS + self.PEAKS + self.TIMES:
+            setattr(self, field, 0)
+
+    def record_solution(self, node):
+        self.solved += 1
+        self.solution_cost += node.path_cost
+        self.solution_length += len(node.solution())
+
+    def __iadd__(self, other):
+        for field in self.COUNTS + self.TIMES:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        for field in self.PEAKS:
+            setattr(self, field, max(getattr(self, field), getattr(other, field)))
+        return self
+
+    def __add__(self, other):
+        total = SearchStats()
+        total += self
+        total += other
+        return total
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.COUNTS + self.PEAKS + self.TIMES}
+
+    def __repr__(self):
+        return ', '.join('{}: {:.4f}'.format(field, value) if isinstance(value, float) else '{}: {}'.format(field, value)
+                         for field, value in self.as_dict().items())
+
+
+def search_events(problem, frontier, stats=None, cancel=None):
     """
-    explored_states = set()
+    Streaming graph search: a generator yielding a SearchEvent for every expanded node and for every
+    improved incumbent (a generated goal node cheaper than the previous ones), and ending with a
+    SOLUTION, EXHAUSTED or CANCELLED event. The search only advances when the next event is requested,
+    so the caller can watch it, interleave it with other work or stop it, also through a SearchCancel.
+    Frontier must already be initialized to problem.initial (the initial node)
+    If a SearchStats is given the search adds its counts and timings to it, otherwise it is not timed.
+    """
+    explored_states = ExploredSet(problem.grid.n_poses)
     counter = 0
+    incumbent = None
+    measure = stats is not None
+    if measure:
+        stats.searches += 1
 
     while not frontier.is_empty(): 
+        if cancel is not None and cancel.should_stop(counter):
+            yield SearchEvent(CANCELLED, incumbent, counter, len(frontier))
+            return
+        if measure:
+            stats.peak_frontier = max(stats.peak_frontier, len(frontier))
+            start = perf_counter()
         node = frontier.select_and_remove()
         counter += 1 
-        n_state_and_direction_and_killed_wumpuses = (node.state, node.direction, str(node.killedWumpuses))
-        
-        if problem.goal_test(node):
-            return node, counter
+        if measure:
+            selected = perf_counter()
+            stats.frontier_time += selected - start
+            stats.expanded += 1
+
+        goal_reached = problem.goal_test(node)
+        if measure:
+            tested = perf_counter()
+            stats.goal_test_time += tested - selected
+        if goal_reached:
+            if measure:
+                stats.record_solution(node)
+            yield SearchEvent(SOLUTION, node, counter, len(frontier))
+            return
         
-        explored_states.add(n_state_and_direction_and_killed_wumpuses)
+        explored_states.add(node.key)
         if node.state in problem.wumpus and node.state not in node.killedWumpuses:
+            yield SearchEvent(EXPANDED, node, counter, len(frontier))
             continue
-        
-        for n in node.expand(problem):
-            n_state_and_direction_and_killed_wumpuses = (n.state, n.direction, str(n.killedWumpuses))
-            if (n_state_and_direction_and_killed_wumpuses not in explored_states) and (not frontier.contains(n)):
+        children = node.expand(problem)
+        if measure:
+            expanded = perf_counter()
+            stats.expansion_time += expanded - tested
+            stats.generated += len(children)
+            stats.peak_explored = max(stats.peak_explored, len(explored_states))
+        improved = None
+        for n in children:
+            if n.key in explored_states:
+                if measure:
+                    stats.duplicates += 1
+                continue
+            if not frontier.contains(n):
                 frontier.add(n)
-        
-    return None, counter
+            else:
+                if measure:
+                    stats.duplicates += 1
+                frontier.decrease_key(n)
+            if problem.goal_test(n) and (incumbent is None or n.path_cost < incumbent.path_cost):
+                incumbent = improved = n
+        if measure:
+            stats.frontier_time += perf_counter() - expanded
+        if improved is not None:
+            yield SearchEvent(INCUMBENT, improved, counter, len(frontier))
+        yield SearchEvent(EXPANDED, node, counter, len(frontier))
+
+    yield SearchEvent(EXHAUSTED, None, counter, 0)
+
+
+def graph_search(problem, frontier, stats=None, cancel=None):
+    """
+    A generic search algorithm, with loop detection. Frontier must already be initialized to problem.initial (the initial node)
+    If a SearchStats is given the search adds its counts and timings to it, otherwise it is not timed.
+    Returns the goal node (or None) and the number of selected nodes. If the SearchCancel stops the
+    search, the goal node is the best one generated so far, if any.
+    """
+    for event in search_events(problem, frontier, stats, cancel):
+        pass
+    return event.node, event.expanded
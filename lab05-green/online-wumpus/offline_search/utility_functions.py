@@ -1,4 +1,9 @@
-from math import sqrt
+import hashlib
+import os
+from collections import OrderedDict, deque
+from math import inf, sqrt
+import numpy as np
+from .search_problem import OrientedGrid, DIRECTIONS
 
 
 def manhattan_distance(pos1, pos2):
@@ -9,3 +14,218 @@ def euclidean_distance(pos1,pos2):
     
 def getClosestGold(eater_locations, gold_locations, heuristic_function):
      return min(gold_locations, key=lambda loc: heuristic_function(eater_locations, loc))
+
+
+#Exact path costs on the grid without the blocks, cached per goal: a drop-in heuristic_function(state, goal).
+#The distance field of a goal is computed on its first query with a NumPy BFS wavefront and the cache keeps
+#at most max_bytes of fields, evicting the least recently used. Moves are reversible, so the path cost from a
+#state to the goal is the one from the goal to the state. Unreachable states get an infinite estimate.
+class DistanceHeuristic:
+    def __init__(self, size, list_of_blocks, max_bytes=16 * 2**20):
+        self.free = np.ones((size[0], size[1]), dtype=bool)
+        for x, y in list_of_blocks:
+            if 0 <= x < size[0] and 0 <= y < size[1]:
+                self.free[x, y] = False
+        self.max_bytes = max_bytes
+        self.fields = OrderedDict() # goal -> distance field indexed [x, y]
+        self.bytes = 0
+
+    def field(self, goal):
+        field = self.fields.get(goal)
+        if field is not None:
+            self.fields.move_to_end(goal)
+            return field
+        field = self.fields[goal] = distance_field(self.free, goal)
+        self.bytes += field.nbytes
+        while self.bytes > self.max_bytes and len(self.fields) > 1:
+            _, evicted = self.fields.popitem(last=False)
+            self.bytes -= evicted.nbytes
+        return field
+
+    def __call__(self, state, goal):
+        distance = self.field(goal)[state[0], state[1]]
+        return int(distance) if distance >= 0 else inf
+
+#Path costs from source to every cell of the bitmap free[x, y] (-1 where unreachable): at every step
+#the neighbours of the whole frontier are computed at once on the flattened bitmap, padded with blocked cells
+def distance_field(free, source):
+    width, height = free.shape
+    padded = np.zeros((width + 2, height + 2), dtype=bool)
+    padded[1:-1, 1:-1] = free
+    passable = padded.ravel()
+    stride = height + 2
+    offsets = np.array([stride, -stride, 1, -1])
+    distance = np.full(passable.size, -1, dtype=np.int32)
+    frontier = np.array([(source[0] + 1) * stride + source[1] + 1])
+    distance[frontier] = 0
+    cost = 0
+    while frontier.size:
+        cost += 1
+        neighbors = np.unique((frontier[:, None] + offsets).ravel())
+        frontier = neighbors[passable[neighbors] & (distance[neighbors] < 0)]
+        distance[frontier] = cost
+    return distance.reshape(padded.shape)[1:-1, 1:-1]
+
+#ALT heuristic of a static map, a drop-in heuristic_function(state, goal) for A_star_runner and take_gold.
+#K landmarks are picked by farthest-point selection (each new one is the free cell farthest from those
+#already chosen) and their exact distances to every cell are kept in a (K, width, height) int32 array.
+#By the triangle inequality max_L |d_L(state) - d_L(goal)| is a lower bound of the path cost.
+#Landmark sets can be saved and loaded with numpy (see cached), keyed by the hash of the map.
+class LandmarkHeuristic:
+    def __init__(self, size, list_of_blocks, k=8, landmarks=None, distances=None):
+        self.free = self.free_cells(size, list_of_blocks)
+        if landmarks is None:
+            landmarks, distances = self.farthest_landmarks(k)
+        self.landmarks = landmarks
+        self.distances = distances # -1 where unreachable
+
+    #Boolean grid of the cells of the map without blocks
+    @staticmethod
+    def free_cells(size, list_of_blocks):
+        free = np.ones((size[0], size[1]), dtype=bool)
+        for x, y in list_of_blocks:
+            if 0 <= x < size[0] and 0 <= y < size[1]:
+                free[x, y] = False
+        return free
+
+    #Hash of the size and of the blocks of a map, identifying its landmark sets on disk
+    @staticmethod
+    def map_hash(free):
+        digest = hashlib.sha1(np.array(free.shape, dtype=np.int64).tobytes())
+        digest.update(np.packbits(free).tobytes())
+        return digest.hexdigest()
+
+    def farthest_landmarks(self, k):
+        free_cells = np.argwhere(self.free)
+        if not len(free_cells):
+            raise ValueError('No free cell for the landmarks')
+        #cells unreachable from all the landmarks count as infinitely far
+        nearest = np.where(self.free, np.iinfo(np.int32).max, -1).astype(np.int64)
+        candidate = tuple(int(v) for v in free_cells[0])
+        landmarks, fields = [], []
+        for _ in range(min(k, len(free_cells))):
+            landmarks.append(candidate)
+            field = distance_field(self.free, candidate)
+            fields.append(field)
+            reached = field >= 0
+            nearest[reached] = np.minimum(nearest[reached], field[reached])
+            nearest[candidate] = -1
+            candidate = np.unravel_index(nearest.argmax(), nearest.shape)
+            candidate = (int(candidate[0]), int(candidate[1]))
+            if nearest[candidate] <= 0:
+                break
+        return landmarks, np.stack(fields).astype(np.int32)
+
+    @classmethod
+    def cached(cls, size, list_of_blocks, k=8, directory='landmarks'):
+        """Load the landmark set of the map saved in directory, computing and saving it if missing"""
+        path = os.path.join(directory, '{}-{}.npz'.format(cls.map_hash(cls.free_cells(size, list_of_blocks)), k))
+        if os.path.exists(path):
+            return cls.load(size, list_of_blocks, path)
+        heuristic = cls(size, list_of_blocks, k)
+        os.makedirs(directory, exist_ok=True)
+        heuristic.save(path)
+        return heuristic
+
+    def save(self, path):
+        np.savez_compressed(path, map_hash=self.map_hash(self.free), landmarks=np.array(self.landmarks, dtype=np.int64),
+                            distances=self.distances)
+
+    @classmethod
+    def load(cls, size, list_of_blocks, path):
+        with np.load(path) as data:
+            if str(data['map_hash']) != cls.map_hash(cls.free_cells(size, list_of_blocks)):
+                raise ValueError('The landmarks in {} were computed for another map'.format(path))
+            landmarks = [tuple(int(v) for v in landmark) for landmark in data['landmarks']]
+            return cls(size, list_of_blocks, landmarks=landmarks, distances=data['distances'])
+
+    def __call__(self, state, goal):
+        from_state = self.distances[:, state[0], state[1]]
+        from_goal = self.distances[:, goal[0], goal[1]]
+        if ((from_state < 0) != (from_goal < 0)).any():
+            return inf #one of them is reachable from a landmark and the other is not
+        both = from_state >= 0
+        if not both.any():
+            return 0
+        return int(np.abs(from_state[both] - from_goal[both]).max())
+
+
+#Minimum number of turns (of 90 degrees) to reach goal from state facing direction: each of the directions the goal
+#lies towards has to be faced at least once, and the hunter turns by 90 degrees per action
+def min_turns(state, goal, direction):
+    needed = []
+    if goal[0] != state[0]:
+        needed.append(1 if goal[0] > state[0] else 3) #E or O
+    if goal[1] != state[1]:
+        needed.append(0 if goal[1] > state[1] else 2) #N or S
+    facing = DIRECTIONS.index(direction)
+    if len(needed) == 2:
+        return 1 if facing in needed else 2
+    if not needed or facing == needed[0]:
+        return 0
+    return 2 if (facing - needed[0]) % 4 == 2 else 1
+
+#Orientation-aware heuristic family: the base position heuristic plus the minimum number of turns. A_star_problem
+#passes the direction to the heuristics with oriented = True; called without it (e.g. by getClosestGold) it is the
+#base heuristic. It stays admissible when moves and turns cost 1, since they are separate actions.
+class OrientedHeuristic:
+    oriented = True
+
+    def __init__(self, base=manhattan_distance):
+        self.base = base
+
+    def __call__(self, state, goal, direction=None):
+        h = self.base(state, goal)
+        if direction is not None:
+            h += min_turns(state, goal, direction)
+        return h
+
+#Exact cost of the moves and turns (1 each) from every pose to a goal cell on the grid without the blocks, in any
+#direction: a backward BFS over the pose tables of OrientedGrid, computed on the first query of a goal and cached
+#for at most max_tables goals, evicting the least recently used. Shots are not counted, so it stays admissible
+#with wumpuses. Without a direction it returns the cost from the best direction. Unreachable poses get infinity.
+class OrientedDistanceTable:
+    oriented = True
+
+    def __init__(self, size, list_of_blocks, max_tables=64):
+        self.grid = OrientedGrid.compile((int(size[0]), int(size[1])), frozenset((int(x), int(y)) for x, y in list_of_blocks))
+        self.max_tables = max_tables
+        self.tables = OrderedDict() # goal -> list of the costs indexed by pose, -1 where unreachable
+
+    def table(self, goal):
+        goal = (int(goal[0]), int(goal[1]))
+        table = self.tables.get(goal)
+        if table is not None:
+            self.tables.move_to_end(goal)
+            return table
+        grid = self.grid
+        table = [-1] * grid.n_poses
+        start = (goal[0] * grid.height + goal[1]) * 4
+        queue = deque(range(start, start + 4))
+        for pose in queue:
+            table[pose] = 0
+        while queue:
+            pose = queue.popleft()
+            cost = table[pose] + 1
+            #predecessors: the two turns, and the move forward from the cell behind facing the same way
+            behind = grid.forward[pose - pose % 4 + (pose + 2) % 4]
+            predecessors = [grid.left[pose], grid.right[pose]]
+            if behind >= 0 and grid.forward[behind - behind % 4 + pose % 4] == pose:
+                predecessors.append(behind - behind % 4 + pose % 4)
+            for previous in predecessors:
+                if table[previous] < 0:
+                    table[previous] = cost
+                    queue.append(previous)
+        self.tables[goal] = table
+        if len(self.tables) > self.max_tables:
+            self.tables.popitem(last=False)
+        return table
+
+    def __call__(self, state, goal, direction=None):
+        table = self.table(goal)
+        pose = (int(state[0]) * self.grid.height + int(state[1])) * 4
+        if direction is not None:
+            cost = table[pose + DIRECTIONS.index(direction)]
+        else:
+            cost = min((c for c in table[pose:pose + 4] if c >= 0), default=-1)
+        return cost if cost >= 0 else inf
@@ -0,0 +1,93 @@
+import numpy as np
+
+#Cells of a grid next to the marked ones (not including them)
+def neighbors_of(grid):
+    around = np.zeros_like(grid)
+    around[1:, :] |= grid[:-1, :]
+    around[:-1, :] |= grid[1:, :]
+    around[:, 1:] |= grid[:, :-1]
+    around[:, :-1] |= grid[:, 1:]
+    return around
+
+#Propagation class
+#Fast path of getSafeAndUnsafeCells, deciding the neighbours of the agent without z3 by propagation over NumPy boolean
+#grids indexed [x][y]. The percepts are marked by State.updateState as they arrive; a query builds the grids of the
+#cells that are known safe, where a pit is possible and where a wumpus is possible on the square of its dimension.
+#The rules are the ones of sat.py: a visited cell without breeze rules out a pit in its neighbours, and a breeze needs
+#a pit in one of the neighbours left possible (the same for stench and wumpus). Nothing else constrains the pits, nor
+#the wumpuses, so a pit is possible exactly in the cells not ruled out, as long as every breeze has a candidate left.
+#A breeze or stench without candidates (a single candidate is a known pit or wumpus, none is a contradiction) leaves
+#the query undecided, and the agent falls back to the z3 knowledge base.
+class Propagation:
+    def __init__(self, size=8):
+        self.breeze = np.zeros((size, size), dtype=bool)
+        self.stench = np.zeros((size, size), dtype=bool) # stench cells of the current epoch, cleared by the scream
+        self.queries = 0
+        self.hits = 0 # queries decided without z3
+
+    #Grow the grids to hold the square of the given dimension
+    def fit(self, dimension):
+        size = self.breeze.shape[0]
+        if dimension > size:
+            grow = max(dimension, 2 * size) - size
+            self.breeze = np.pad(self.breeze, ((0, grow), (0, grow)))
+            self.stench = np.pad(self.stench, ((0, grow), (0, grow)))
+
+    def observe_breeze(self, cell):
+        self.fit(max(cell) + 1)
+        self.breeze[cell[0], cell[1]] = True
+
+    def observe_stench(self, cell):
+        self.fit(max(cell) + 1)
+        self.stench[cell[0], cell[1]] = True
+
+    def scream(self):
+        self.stench[:] = False
+
+    def hit_rate(self):
+        return self.hits / self.queries if self.queries else 0
+
+    #Known safe cells, possible pits and possible wumpuses on the square of the given dimension, or None if a breeze or
+    #a stench has no candidate left
+    def grids(self, dimension, visitedCells):
+        self.fit(dimension)
+        visited = np.zeros((dimension, dimension), dtype=bool)
+        for x, y in visitedCells:
+            visited[x, y] = True
+        possible = []
+        for percept in (self.breeze[:dimension, :dimension], self.stench[:dimension, :dimension]):
+            hazard = ~neighbors_of(visited & ~percept)
+            if (percept & ~neighbors_of(hazard)).any():
+                return None
+            possible.append(hazard)
+        possiblePits, possibleWumpus = possible
+        return ~(possiblePits | possibleWumpus), possiblePits, possibleWumpus
+
+    #Safe and unsafe neighbours of currentPosition and the neighbours with a possible wumpus, as sat.getSafeAndUnsafeCells,
+    #or None if the query is left undecided
+    def getSafeAndUnsafeCells(self, currentPosition, currentDimension, visitedCells):
+        self.queries += 1
+        dimension = currentDimension[0]
+        grids = self.grids(dimension, visitedCells)
+        if grids is None:
+            return None
+        self.hits += 1
+        knownSafe, _, possibleWumpus = grids
+        #The far corner is never reported as a possible pit or wumpus
+        knownSafe[dimension - 1, dimension - 1] = True
+        possibleWumpus[dimension - 1, dimension - 1] = False
+        x, y = int(currentPosition[0]), int(currentPosition[1])
+        neighbors = [(i, j) for i, j in [(x - 1, y), (x, y - 1), (x, y + 1), (x + 1, y)] if 0 <= i < dimension and 0 <= j < dimension]
+
+        safe_cells = set()
+        unsafe_cells = set()
+
+        for i, j in sorted(neighbors):
+            if (i,j) in visitedCells:
+                continue
+            if knownSafe[i, j]:
+                safe_cells.add((i,j))
+            else:
+                unsafe_cells.add((i,j))
+
+        return list(safe_cells), list(unsafe_cells), [cell for cell in neighbors if possibleWumpus[cell] and cell not in visitedCells]
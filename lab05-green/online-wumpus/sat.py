@@ -1,74 +1,116 @@
 from z3 import *
 
-def getSafeAndUnsafeCells(currentPosition, currentDimension, breeze_in, stench_in, visitedCells): 
-    solver=Solver()
+#KnowledgeBase class
+#Persistent z3 knowledge base of the online agent, owned by its State. The breeze and stench rules of a cell are added
+#once, the first time a percept is known there (the rules of the other cells only define their free breeze and stench
+#variables, so they can be left out), and every fact is asserted once, when it first shows up in the percepts.
+#The rules of a cell mention all its neighbours with non-negative coordinates: the cells outside the dimension of a
+#query are ruled out by assuming no pit and no wumpus there. The facts belong to an epoch, guarded by a literal assumed
+#by the queries: when a fact no longer holds (the stench cells are cleared by the scream) a new epoch starts, asserting
+#the facts of the current percepts again, and the facts of the previous one are dropped.
+class KnowledgeBase:
+    def __init__(self):
+        self.solver = Solver()
+        self.variables = {} # cell -> (breeze, stench, pit, wumpus) variables
+        self.ruled = set() # cells whose rules were added
+        self.facts = {} # (variable index, cell) -> fact asserted in the current epoch: 0 for breeze, 1 for stench
+        self.epochs = 0
+        self.epoch = Bool('epoch_0')
 
-    stench_cells = [[Bool(f's_{i}_{j}') for j in range(currentDimension[0])] for i in range(currentDimension[0])]
-    breeze_cells = [[Bool(f'b_{i}_{j}') for j in range(currentDimension[0])] for i in range(currentDimension[0])]
-    pits_cells = [[Bool(f'p_{i}_{j}') for j in range(currentDimension[0])] for i in range(currentDimension[0])]
-    wumpus_cells = [[Bool(f'w_{i}_{j}') for j in range(currentDimension[0])] for i in range(currentDimension[0])]
+    def cell_variables(self, cell):
+        variables = self.variables.get(cell)
+        if variables is None:
+            i, j = cell
+            variables = self.variables[cell] = (Bool(f'b_{i}_{j}'), Bool(f's_{i}_{j}'), Bool(f'p_{i}_{j}'), Bool(f'w_{i}_{j}'))
+        return variables
 
+    def add_rules(self, cell):
+        if cell in self.ruled:
+            return
+        self.ruled.add(cell)
+        i, j = cell
+        breeze, stench, _, _ = self.cell_variables(cell)
+        neighbors = [self.cell_variables((x, y)) for x, y in [(i - 1, j), (i, j - 1), (i, j + 1), (i + 1, j)] if x >= 0 and y >= 0]
+        self.solver.add(Implies(breeze, Or([n[2] for n in neighbors])))
+        self.solver.add(Implies(stench, Or([n[3] for n in neighbors])))
+        self.solver.add(Implies(breeze == False, And([n[2] == False for n in neighbors])))
+        self.solver.add(Implies(stench == False, And([n[3] == False for n in neighbors])))
 
-    #Facts
-    for x, y in breeze_in:
-        solver.add(breeze_cells[x][y])
+    #Start a new epoch: the facts asserted so far are dropped
+    def new_epoch(self):
+        self.solver.add(Not(self.epoch))
+        self.epochs += 1
+        self.epoch = Bool(f'epoch_{self.epochs}')
+        self.facts = {}
 
-    for x in range(currentDimension[0]):
-        for y in range(currentDimension[0]):
-            if (x,y) not in breeze_in and (x,y) in visitedCells:
-                solver.add(breeze_cells[x][y] == False)
-    
-    for x, y in stench_in:
-        solver.add(stench_cells[x][y])
-    for x in range(currentDimension[0]):
-        for y in range(currentDimension[0]):
-            if (x,y) not in stench_in and (x,y) in visitedCells:
-                solver.add(stench_cells[x][y] == False)
-    
+    #Assert the facts not asserted yet: breeze and stench where they were percepted, none in the other visited cells
+    def tell(self, breeze_in, stench_in, visitedCells):
+        visited = {(int(x), int(y)) for x, y in visitedCells}
+        percepts = ({(int(x), int(y)) for x, y in breeze_in}, {(int(x), int(y)) for x, y in stench_in})
+        facts = {(index, cell): cell in percepted for index, percepted in enumerate(percepts) for cell in percepted | visited}
+        if any(facts.get(key, fact) != fact for key, fact in self.facts.items()):
+            self.new_epoch()
+        for (index, cell), fact in facts.items():
+            if (index, cell) not in self.facts:
+                self.add_rules(cell)
+                self.facts[(index, cell)] = fact
+                variable = self.cell_variables(cell)[index]
+                self.solver.add(Implies(self.epoch, variable if fact else Not(variable)))
 
-    #Constraints
-    
-    for i in range(currentDimension[0]):
-        for j in range(currentDimension[0]):            
-            neighbors = [(x, y) for x, y in [(i - 1, j), (i, j - 1), (i, j + 1), (i + 1, j)] if 0 <= x < currentDimension[0] and 0 <= y < currentDimension[0]]
-            solver.add(Implies(breeze_cells[i][j], Or([pits_cells[x][y] for x, y in neighbors])))
-            solver.add(Implies(stench_cells[i][j], Or([wumpus_cells[x][y] for x, y in neighbors])))
-            solver.add(Implies(breeze_cells[i][j]==False, And(list([(pits_cells[x][y]==False) for x, y in neighbors]))))
-            solver.add(Implies(stench_cells[i][j]==False, And(list([(wumpus_cells[x][y]==False) for x, y in neighbors]))))
-    
-    possiblePits = []
-    possibleWumpus = []
+    #Assumptions of a query on the square of the given dimension
+    def assumptions(self, dimension):
+        assumptions = [self.epoch]
+        for (x, y), (_, _, pit, wumpus) in self.variables.items():
+            if x >= dimension or y >= dimension:
+                assumptions += [Not(pit), Not(wumpus)]
+        return assumptions
 
+    #Cells of the given ones where a pit and where a wumpus are possible. A pit is possible in a cell if the knowledge base
+    #is satisfiable assuming a pit there, so each cell takes at most two checks: fewer, since a model found by a check
+    #shows every pit and wumpus it has in the other cells as possible too. All the checks run on the same solver and
+    #share the clauses it learns.
+    def possible(self, cells, assumptions):
+        possiblePits, possibleWumpus = [], []
+        for cell in cells:
+            for index, found in ((2, possiblePits), (3, possibleWumpus)):
+                if cell in found or self.solver.check(assumptions + [self.variables[cell][index]]) != sat:
+                    continue
+                model = self.solver.model()
+                for other in cells:
+                    for otherIndex, otherFound in ((2, possiblePits), (3, possibleWumpus)):
+                        if other not in otherFound and is_true(model.eval(self.variables[other][otherIndex], model_completion=True)):
+                            otherFound.append(other)
+        return possiblePits, possibleWumpus
 
-    #Restrict the checks on the cells we are interested in
-    neighbors = [(x, y) for x, y in [(currentPosition[0] - 1, currentPosition[1]), (currentPosition[0], currentPosition[1] - 1), (currentPosition[0], currentPosition[1] + 1), (currentPosition[0] + 1, currentPosition[1])] if 0 <= x < currentDimension[0] and 0 <= y < currentDimension[0]]
+    #Safe and unsafe neighbours of currentPosition and the neighbours with a possible wumpus, as getSafeAndUnsafeCells
+    def getSafeAndUnsafeCells(self, currentPosition, currentDimension, breeze_in, stench_in, visitedCells):
+        self.tell(breeze_in, stench_in, visitedCells)
+        dimension = currentDimension[0]
+        #Restrict the checks on the cells we are interested in
+        x, y = int(currentPosition[0]), int(currentPosition[1])
+        neighbors = [(i, j) for i, j in [(x - 1, y), (x, y - 1), (x, y + 1), (x + 1, y)] if 0 <= i < dimension and 0 <= j < dimension]
+        for cell in neighbors:
+            self.cell_variables(cell)
+        #The far corner is never reported as a possible pit or wumpus
+        cells = [cell for cell in neighbors if cell != (dimension - 1, dimension - 1) and cell not in visitedCells]
+        possiblePits, possibleWumpus = self.possible(cells, self.assumptions(dimension))
 
-    while solver.check() == sat:
-        model = solver.model()
-        possibleWumpus += ([(i, j) for i in range(currentDimension[0]) for j in range(currentDimension[0]) if is_true(model[wumpus_cells[i][j]]) and (i,j) not in possibleWumpus if (i != currentDimension[0]-1 or j != currentDimension[0]-1) and (i,j) not in visitedCells])
-        possiblePits += ([(i, j) for i in range(currentDimension[0]) for j in range(currentDimension[0]) if is_true(model[pits_cells[i][j]]) and (i,j) not in possiblePits if (i != currentDimension[0]-1 or j != currentDimension[0]-1) and (i,j) not in visitedCells])
-        
-        comparisons = []
-        for scope in [pits_cells, wumpus_cells]:
-            for neighbor in neighbors:
-                comparisons += [scope[neighbor[0]][neighbor[1]] != is_true(model[scope[neighbor[0]][neighbor[1]]]) ]
-        if comparisons:
-            solver.add(Or(comparisons))
-        else:
-            break
-    #print("possiblePits: ",possiblePits)
-    #print("possibleWumpus: ",possibleWumpus)
+        safe_cells = set()
+        unsafe_cells = set()
 
-    safe_cells = set()
-    unsafe_cells = set()
-
-    for i in range(currentDimension[0]):
-        for j in range(currentDimension[0]):
-            if  (i,j) in visitedCells: 
+        for i, j in sorted(neighbors):
+            if (i,j) in visitedCells:
                 continue
-            if (i,j) not in possiblePits and (i,j) not in possibleWumpus and (i,j) in neighbors:
+            if (i,j) not in possiblePits and (i,j) not in possibleWumpus:
                 safe_cells.add((i,j))
-            elif ((i,j) in neighbors):
+            else:
                 unsafe_cells.add((i,j))
 
-    return list(safe_cells), list(unsafe_cells), list(possibleWumpus)
+        return list(safe_cells), list(unsafe_cells), list(possibleWumpus)
+
+
+def getSafeAndUnsafeCells(currentPosition, currentDimension, breeze_in, stench_in, visitedCells, knowledge=None):
+    #Without a knowledge base of the agent a new one is built for this query
+    if knowledge is None:
+        knowledge = KnowledgeBase()
+    return knowledge.getSafeAndUnsafeCells(currentPosition, currentDimension, breeze_in, stench_in, visitedCells)
@@ -56,6 +56,10 @@ class UserPlayerSafe(wws.OnlinePlayer):
         chosenAction = self.state.chooseAction(actions_dict)
         return chosenAction            
 
+    def end_episode(self, outcome: int, alive: bool, success: bool):
+        propagation = self.state.propagation
+        print('Turns decided by propagation: {}/{} ({:.1%})'.format(propagation.hits, propagation.queries, propagation.hit_rate()))
+
 
 class UserPlayerRisky(UserPlayerSafe):
     def __init__(self, name: str = None):
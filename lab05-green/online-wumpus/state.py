@@ -2,12 +2,15 @@ import numpy as np
 from ordered_stack import *
 from probabilistic_reasoner import Probabilistic_reasoner
 from offline_search.A_star_problem import offline_search
-from sat import getSafeAndUnsafeCells  
+from sat import getSafeAndUnsafeCells, KnowledgeBase
+from propagation import Propagation
 
 # State class
 # Class that keeps track of the information about the current state of the world and consecutively manages the actions to be executed by the agent 
 # according to the percepts 
 class State:
+    planningBudget = 5000 # nodes the offline search may expand in a turn before settling for the best plan found so far
+
     def __init__(self, currentPosition, currentDirection, currentDimension, breeze_cells, stench_cells, visitedCells, safeCells,  unsafeCells, riskyAgent):
         self.currentPosition = currentPosition  # store the current position of the hunter
         self.currentDirection = currentDirection # store the current direction of the hunter
@@ -23,6 +26,8 @@ class State:
         self.mapBoundReached=False  
         self.hasShot = False
         self.riskyAgent = riskyAgent
+        self.knowledge = KnowledgeBase() # z3 knowledge base kept across the turns, see sat.py
+        self.propagation = Propagation() # fast path deciding most of the turns without z3, see propagation.py
          
     #Function that update the state variable according to percepts     
     def updateState(self, perceptString):
@@ -35,11 +40,14 @@ class State:
         if "Stench" in percepts:
             if self.currentPosition not in self.stench_cells:
                     self.stench_cells.append((self.currentPosition[0],self.currentPosition[1]))
+                    self.propagation.observe_stench(self.currentPosition)
         if "Scream" in percepts: 
             self.stench_cells = [] # Remove all stench cells since wumpus has been killed
+            self.propagation.scream()
         if "Breeze" in percepts:
             if self.currentPosition not in self.breeze_cells :
                 self.breeze_cells.append((self.currentPosition[0],self.currentPosition[1]))
+                self.propagation.observe_breeze(self.currentPosition)
         
     
     def rotateLeft(self):
@@ -103,11 +111,13 @@ class State:
             return handleTakeGoal    
             
 
-        #Exploit the sat solver to deduce the safe and unsafe cells by taking into consideration breeze and stench cells discovered so far
-        if(not self.mapBoundReached):
-            localSafeCells, localUnsafeCells, possibleWumpus = getSafeAndUnsafeCells(self.currentPosition, (self.currentDimension[0]+1,self.currentDimension[1]+1), self.breeze_cells, self.stench_cells, self.visitedCells)
-        else:  
-            localSafeCells, localUnsafeCells,possibleWumpus = getSafeAndUnsafeCells(self.currentPosition, self.currentDimension, self.breeze_cells, self.stench_cells, self.visitedCells)
+        #Deduce the safe and unsafe cells by taking into consideration breeze and stench cells discovered so far, by propagation
+        #if it decides them and otherwise with the sat solver
+        searchBound = (self.currentDimension[0]+1,self.currentDimension[1]+1) if not self.mapBoundReached else self.currentDimension
+        decided = self.propagation.getSafeAndUnsafeCells(self.currentPosition, searchBound, self.visitedCells)
+        if decided is None:
+            decided = getSafeAndUnsafeCells(self.currentPosition, searchBound, self.breeze_cells, self.stench_cells, self.visitedCells, self.knowledge)
+        localSafeCells, localUnsafeCells, possibleWumpus = decided
         self.possibleWumpus=possibleWumpus
         for cell in localSafeCells:
             if cell in self.unsafeCells.stack:
@@ -154,9 +164,16 @@ class State:
     
 
     #Backtrack to a destination using the offline search strategy 
+    #The search is stopped after planningBudget expansions with the best plan found so far: if it found none it is run again
+    #without the limit, and if the destination cannot be reached at all the agent goes back to the start and climbs out
     def handle_backtracking(self,goal,isClimbing,actions):
         if(not self.isBacktracking):
-            self.listOfActionToOrigin=offline_search(self.currentPosition,self.currentDirection,goal,self.visitedCells+self.safeCells.stack,actions,self.currentDimension)
+            knownCells=self.visitedCells+self.safeCells.stack
+            self.listOfActionToOrigin=offline_search(self.currentPosition,self.currentDirection,goal,knownCells,actions,self.currentDimension,max_expansions=self.planningBudget)
+            if(not self.listOfActionToOrigin):
+                self.listOfActionToOrigin=offline_search(self.currentPosition,self.currentDirection,goal,knownCells,actions,self.currentDimension)
+            if(not self.listOfActionToOrigin and not isClimbing):
+                return self.handle_backtracking((0,0),True,actions)
             if(isClimbing):
                 self.listOfActionToOrigin=self.listOfActionToOrigin+[actions["CLIMB"]]
             self.isBacktracking=True 